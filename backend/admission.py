@@ -0,0 +1,284 @@
+"""
+요청 수용 제어 (클라이언트별 속도 제한 + 무거운 라우트 격리)
+
+라우트를 비용 등급으로 나눠
+1. 클라이언트 × 등급마다 토큰 버킷으로 속도를 제한하고 (초과 시 429 + Retry-After)
+2. 무거운 등급(chat/search/external)은 등급별 동시 실행 슬롯과 대기열 길이를 제한합니다.
+   대기열이 가득 차거나 대기 시간이 넘으면 바로 503 으로 거절(shed)합니다.
+3. 무거운 요청은 (실행 + 대기) 합계가 워커 스레드 수 - MAP_RESERVED_THREADS 를 넘지 못하므로
+   지도용 가벼운 라우트(map)는 항상 남은 스레드에서 바로 처리됩니다.
+
+토큰 버킷은 워커(프로세스)마다 따로 있으므로 RATE / BURST 는 서버 전체 한도로 보고 워커 수
+(GUNICORN_WORKERS)로 나눠 씁니다. 한 클라이언트의 요청이 워커들에 고르게 퍼진다고 가정하므로
+keep-alive 로 한 워커에만 붙은 클라이언트에게는 더 엄격하고, BURST 는 워커당 최소 1 이라
+워커 수보다 작게 줄일 수 없습니다. 동시 실행 슬롯/대기열은 워커별 값입니다.
+처리/차단 건수는 /api/health 의 "admission" 에 나옵니다.
+
+환경 변수
+    ADMISSION_CONTROL=0            끄기
+    ADMISSION_TRUST_PROXY=1        X-Forwarded-For 첫 주소를 클라이언트로 사용 (프록시 뒤에서 / 재생 테스트)
+    ADMISSION_MAP_RESERVED_THREADS 지도 라우트용으로 남겨 둘 스레드 수 (기본 1)
+    ADMISSION_<등급>_RATE / _BURST / _SLOTS / _QUEUE / _TIMEOUT   등급별 설정 (예: ADMISSION_CHAT_RATE=0.2)
+    GUNICORN_WORKERS               워커 수 (gunicorn.conf.py 가 설정, 없으면 1 = 개발 서버)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, jsonify, request
+
+ENABLED = os.getenv("ADMISSION_CONTROL", "1") != "0"
+TRUST_PROXY = os.getenv("ADMISSION_TRUST_PROXY", "0") == "1"
+MAP_RESERVED_THREADS = int(os.getenv("ADMISSION_MAP_RESERVED_THREADS", "1"))
+WORKERS = max(1, int(os.getenv("GUNICORN_WORKERS", "1")))
+MAX_CLIENTS = 10000  # 버킷을 보관할 최대 (클라이언트, 등급) 수, 넘으면 오래된 것부터 버림
+
+# 라우트 → 비용 등급 (없는 라우트는 map)
+ROUTE_CLASSES = {
+    "/api/chat": "chat",          # 전체 저장소 regex 스캔 + LLM 호출
+    "/api/search": "search",      # CONTAINS 스캔 (케이스 4)
+    "/api/animals": "external",   # 서울시 Open API + 질병 조회
+}
+EXEMPT_ROUTES = {"/api/health"}
+
+
+def _setting(cost_class, name, default, cast=float):
+    return cast(os.getenv(f"ADMISSION_{cost_class.upper()}_{name}", default))
+
+
+def _class_config(cost_class, rate, burst, slots=None, queue=0, timeout=0.0, workers=WORKERS):
+    """rate: 초당 허용 요청, burst: 버킷 크기 (둘 다 서버 전체 기준, 워커 수로 나눔),
+    slots: 워커당 동시 실행 수(None 이면 제한 없음), queue: 슬롯을 기다릴 수 있는 요청 수,
+    timeout: 최대 대기 시간(초)"""
+    return {
+        "rate": _setting(cost_class, "RATE", rate) / workers,
+        # 버킷에 토큰이 1개는 들어가야 요청을 받을 수 있음
+        "burst": max(1.0, _setting(cost_class, "BURST", burst) / workers),
+        "slots": _setting(cost_class, "SLOTS", slots, int) if slots is not None else None,
+        "queue": _setting(cost_class, "QUEUE", queue, int),
+        "timeout": _setting(cost_class, "TIMEOUT", timeout),
+    }
+
+
+COST_CLASSES = {
+    "map": _class_config("map", rate=20, burst=60),
+    "external": _class_config("external", rate=2, burst=10, slots=2, queue=4, timeout=5.0),
+    "search": _class_config("search", rate=2, burst=10, slots=2, queue=4, timeout=5.0),
+    "chat": _class_config("chat", rate=0.1, burst=3, slots=1, queue=2, timeout=15.0),
+}
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now):
+        """토큰 하나를 쓰면 0, 모자라면 다음 토큰까지 남은 시간(초)"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else 60.0
+
+
+class WorkPool:
+    """등급별 동시 실행 슬롯 + 길이 제한 대기열.
+    threading.Condition 은 먼저 기다린 스레드부터 깨우므로 대기 순서는 도착 순서를 따릅니다."""
+
+    def __init__(self, slots, queue, timeout):
+        self.slots = slots
+        self.queue = queue
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self.running = 0
+        self.waiting = 0
+
+    def acquire(self):
+        """슬롯을 얻으면 (True, 대기 초), 대기열이 가득 차면 (False, "queue_full"), 시간 초과면 (False, "timeout")"""
+        with self._cond:
+            # 이미 기다리는 요청이 있으면 새치기하지 않고 뒤에 줄 섬
+            if self.running < self.slots and self.waiting == 0:
+                self.running += 1
+                return True, 0.0
+            if self.waiting >= self.queue:
+                return False, "queue_full"
+
+            self.waiting += 1
+            started = time.monotonic()
+            try:
+                while self.running >= self.slots:
+                    remaining = started + self.timeout - time.monotonic()
+                    if remaining <= 0:
+                        # 이 스레드가 받은 깨움 신호가 있었다면 다음 대기자에게 넘김
+                        self._cond.notify()
+                        return False, "timeout"
+                    self._cond.wait(remaining)
+                self.running += 1
+                return True, time.monotonic() - started
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self._cond:
+            self.running -= 1
+            self._cond.notify()
+
+
+class AdmissionController:
+    def __init__(self, classes=COST_CLASSES, threads=None, reserved=MAP_RESERVED_THREADS):
+        threads = threads or int(os.getenv("GUNICORN_THREADS", "0"))
+        self.classes = classes
+        # 개발 서버(요청마다 스레드)는 스레드 수 제한이 없으므로 무거운 요청 합계도 제한하지 않음
+        self.max_heavy = max(1, threads - reserved) if threads else None
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+        self._pools = {}
+        for name, config in classes.items():
+            if config["slots"] is not None:
+                self._pools[name] = WorkPool(config["slots"], config["queue"], config["timeout"])
+        self.reset()
+
+    def reset(self):
+        """fork 직후 호출: 부모(preload) 프로세스의 카운터를 물려받지 않도록 초기화"""
+        with self._lock:
+            self._buckets.clear()
+            self.heavy_in_flight = 0
+            self.counters = {name: {"admitted": 0, "throttled": 0, "shed_queue_full": 0,
+                                    "shed_timeout": 0, "shed_overload": 0,
+                                    "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+                             for name in self.classes}
+
+    def _count(self, cost_class, key, wait=None):
+        with self._lock:
+            counters = self.counters[cost_class]
+            counters[key] += 1
+            if wait is not None:
+                ms = wait * 1000.0
+                counters["wait_ms_total"] += ms
+                counters["wait_ms_max"] = max(counters["wait_ms_max"], ms)
+
+    def check_rate(self, client, cost_class):
+        """토큰 버킷 확인: 허용이면 0, 아니면 Retry-After 초"""
+        config = self.classes[cost_class]
+        now = time.monotonic()
+        key = (client, cost_class)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(config["rate"], config["burst"], now)
+                if len(self._buckets) > MAX_CLIENTS:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            retry_after = bucket.take(now)
+        if retry_after:
+            self._count(cost_class, "throttled")
+        return retry_after
+
+    def enter(self, cost_class):
+        """무거운 등급이면 슬롯 확보. 성공 시 None, 거절 시 사유 문자열"""
+        pool = self._pools.get(cost_class)
+        if pool is None:
+            self._count(cost_class, "admitted")
+            return None
+
+        with self._lock:
+            if self.max_heavy is not None and self.heavy_in_flight >= self.max_heavy:
+                self.counters[cost_class]["shed_overload"] += 1
+                return "overload"
+            self.heavy_in_flight += 1
+
+        ok, detail = pool.acquire()
+        if not ok:
+            with self._lock:
+                self.heavy_in_flight -= 1
+            self._count(cost_class, f"shed_{detail}")
+            return detail
+        self._count(cost_class, "admitted", wait=detail)
+        return None
+
+    def leave(self, cost_class):
+        pool = self._pools.get(cost_class)
+        if pool is None:
+            return
+        pool.release()
+        with self._lock:
+            self.heavy_in_flight -= 1
+
+    def snapshot(self):
+        with self._lock:
+            info = {"clients": len(self._buckets), "heavy_in_flight": self.heavy_in_flight,
+                    "max_heavy": self.max_heavy, "workers": WORKERS, "classes": {}}
+            for name, counters in self.counters.items():
+                stats = dict(counters)
+                stats["wait_ms_total"] = round(stats["wait_ms_total"], 1)
+                stats["wait_ms_max"] = round(stats["wait_ms_max"], 1)
+                pool = self._pools.get(name)
+                if pool is not None:
+                    stats["running"] = pool.running
+                    stats["queued"] = pool.waiting
+                info["classes"][name] = stats
+        return info
+
+
+admission_controller = AdmissionController()
+
+
+def client_key():
+    if TRUST_PROXY:
+        forwarded = request.headers.get("X-Forwarded-For")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.remote_addr or "unknown"
+
+
+def cost_class_of(route):
+    return ROUTE_CLASSES.get(route, "map")
+
+
+def init_app(app, controller=admission_controller, enabled=ENABLED):
+    """속도 제한/격리 훅을 등록합니다. 거절된 요청은 429(속도 제한) 또는 503(혼잡)으로 응답합니다."""
+    if not enabled:
+        return None
+
+    @app.before_request
+    def _admit():
+        if request.method == "OPTIONS" or request.url_rule is None:
+            return None
+        route = request.url_rule.rule
+        if route in EXEMPT_ROUTES:
+            return None
+        cost_class = cost_class_of(route)
+
+        retry_after = controller.check_rate(client_key(), cost_class)
+        if retry_after:
+            response = jsonify({"error": "요청이 너무 많습니다. 잠시 후 다시 시도해주세요.",
+                                "retry_after": round(retry_after, 1)})
+            response.status_code = 429
+            response.headers["Retry-After"] = str(max(1, int(retry_after + 0.999)))
+            return response
+
+        rejected = controller.enter(cost_class)
+        if rejected:
+            response = jsonify({"error": "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                                "reason": rejected})
+            response.status_code = 503
+            response.headers["Retry-After"] = "1"
+            return response
+        g._admission_class = cost_class
+        return None
+
+    @app.teardown_request
+    def _release(exc):
+        cost_class = g.pop("_admission_class", None)
+        if cost_class is not None:
+            controller.leave(cost_class)
+
+    return controller
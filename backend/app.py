@@ -1,28 +1,35 @@
 import os
 from dotenv import load_dotenv
+# 다른 모듈이 import 시점에 환경 변수(GRAPHDB_URL 등)를 읽으므로 가장 먼저 로드
+load_dotenv()
 from flask import Flask, request, jsonify 
 from flask_cors import CORS
 import time
 from datetime import timedelta
-import google.generativeai as genai
-import requests
-from sparql_client import KnowledgeGraph 
-from utils import ANIMAL_MAP, map_text_to_uri
-from SPARQLWrapper import SPARQLWrapper, JSON 
+from sparql_client import get_sparql
+from species import classify_rows
+import geocode_cache
+from opening_hours import DAY_ORDER
+from chat_context import (SOURCES, SYMPTOM_KEYWORDS, SYSTEM_INSTRUCTION, build_user_prompt, estimate_tokens,
+                          format_context, prompt_token_stats, rank_passages, select_passages)
 import logging
 from graphdb_api import graphdb_bp
-
-load_dotenv()
-
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+from facility_sync import facility_sync_bp
+from http_cache import cached_json, data_generation
+from snapshot import get_snapshot, on_load as on_snapshot_load
+import worker_stats
+import traffic_capture
+import admission
+from admission import admission_controller
+from traffic_capture import upstream_call
+# 무거운 클라이언트(Gemini, SPARQL, requests)는 services 에서 처음 쓸 때 로드
+from services import get_chat_model, get_knowledge_graph, get_http_session
 
 app = Flask(__name__)
-SPARQL_ENDPOINT = "http://localhost:7200/repositories/knowledgemap" 
-sparql = SPARQLWrapper(SPARQL_ENDPOINT)
+SPARQL_ENDPOINT = os.getenv("GRAPHDB_URL", "http://localhost:7200/repositories/knowledgemap")
 app.register_blueprint(graphdb_bp)
-GRAPHDB_URL = "http://localhost:7200/repositories/knowledgemap" 
+app.register_blueprint(facility_sync_bp)
+GRAPHDB_URL = SPARQL_ENDPOINT
 CORS(app, resources={
     r"/api/*": {
         "origins": ["http://localhost:5173"],
@@ -33,67 +40,36 @@ CORS(app, resources={
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)
 
-@app.route('/api/facilities', methods=['GET'])
-def get_facilities_by_gu():
-    gu_name = request.args.get('gu')
-    if not gu_name:
-        return jsonify({"error": "No gu provided"}), 400
-
-    print(f"[DEBUG] 시설 목록 조회 요청: {gu_name}")
-
-    try:
-        local_sparql = SPARQLWrapper(GRAPHDB_URL)
-        local_sparql.setReturnFormat(JSON)
-
-        query = f"""
-        SELECT ?s ?name ?lat ?lng ?category ?address
-        WHERE {{
-            ?s ?pName ?name .
-            FILTER(STRENDS(STR(?pName), "name"))
+# 스냅샷이 있으면 워커끼리 같은 세대 번호(ETag)를 쓰도록 맞춤.
+# 스냅샷은 import 시점(gunicorn 마스터의 preload)이 아니라 워커마다 처음 쓸 때 열리므로
+# kill -HUP 으로 워커를 교체하면 새로 빌드된 스냅샷 파일을 읽습니다. (gunicorn.conf.py post_fork)
+def _sync_snapshot_generation(snap):
+    # 변경 이력(facility_sync)으로 이미 더 새 세대가 반영되었으면 낮추지 않음
+    if snap.generation > data_generation.version:
+        data_generation.set(snap.generation, snap.built_at)
 
-            ?s ?pLat ?lat .
-            FILTER(STRENDS(STR(?pLat), "lat") || STRENDS(STR(?pLat), "latitude"))
 
-            ?s ?pLng ?lng .
-            FILTER(STRENDS(STR(?pLng), "lng") || STRENDS(STR(?pLng), "longitude"))
-            
-            ?s ?pAddress ?address .
-            FILTER(STRENDS(STR(?pAddress), "address") || STRENDS(STR(?pAddress), "streetAddress"))
-            FILTER(CONTAINS(?address, "{gu_name}"))
+on_snapshot_load(_sync_snapshot_generation)
 
-            OPTIONAL {{
-                ?s ?pCat ?category .
-                FILTER(STRENDS(STR(?pCat), "category") || STRENDS(STR(?pCat), "type"))
-            }}
-        }}
-        """
+# 워커별 동시 처리 현황 (/api/health)
+worker_stats.init_app(app, extra=lambda: {
+    "generation": data_generation.version,
+    "snapshot": get_snapshot() is not None,
+    "chat": prompt_token_stats.snapshot(),
+    "admission": admission_controller.snapshot(),
+})
 
-        local_sparql.setQuery(query)
-        results = local_sparql.query().convert()
+# TRAFFIC_CAPTURE_PATH 가 설정된 경우에만 요청 트레이스 수집 (bench/replay.py 로 재생)
+traffic_capture.init_app(app)
 
-        facilities = []
-        for r in results["results"]["bindings"]:
-            # [수정] 카테고리 값이 URI일 경우 뒷부분만 추출 (예: http://.../동물병원 -> 동물병원)
-            raw_cat = r.get("category", {}).get("value", "기타")
-            category_label = raw_cat
-            if "http" in raw_cat:
-                category_label = raw_cat.split('/')[-1].split('#')[-1]
-            
-            facilities.append({
-                "id": r["s"]["value"],
-                "name": r["name"]["value"],
-                "lat": float(r["lat"]["value"]),
-                "lng": float(r["lng"]["value"]),
-                "category": category_label, # 정제된 카테고리 사용
-                "address": r["address"]["value"]
-            })
+# 클라이언트별 속도 제한 + 무거운 라우트(chat/search/animals) 동시 실행 제한
+# (트레이스 수집 훅 뒤에 등록해야 429/503 응답도 트레이스에 남음)
+admission.init_app(app)
 
-        print(f"[DEBUG] {len(facilities)}개 시설 발견 ({gu_name})")
-        return jsonify(facilities), 200
+# /api/facilities 는 graphdb_api.graphdb_bp 가 처리합니다 (블루프린트가 먼저 등록되어 같은 경로를 가져감)
 
-    except Exception as e:
-        print(f"[ERROR] 시설 목록 조회 실패: {e}")
-        return jsonify({"error": str(e)}), 500
+# 상세 정보에서 제외하는 운영 시간 관련 키 (덮어쓰기 방지)
+HOURS_KEYS = {'opens', 'closes', 'dayOfWeek', 'hours', 'facility'}
 
 
 @app.route('/api/facility/detail', methods=['GET'])
@@ -105,90 +81,26 @@ def get_facility_detail():
     print(f"[DEBUG] 조회 ID: {clean_id}")
 
     try:
-        sparql = SPARQLWrapper(GRAPHDB_URL)
-        sparql.setReturnFormat(JSON)
-
-        # -------------------------------------------------------
-        # [Step 1] 기본 정보 조회 (시간 정보 제외)
-        # -------------------------------------------------------
-        query_basic = f"SELECT ?p ?o WHERE {{ <{clean_id}> ?p ?o . }}"
-        sparql.setQuery(query_basic)
-        results_basic = sparql.query().convert()
-
-        data = {}
-        for result in results_basic["results"]["bindings"]:
-            pred_uri = result["p"]["value"]
-            val = result["o"]["value"]
-            key = pred_uri.split('#')[-1].split('/')[-1]
-            
-            # 시간 관련 키는 무시 (덮어쓰기 방지)
-            if key in ['opens', 'closes', 'dayOfWeek', 'hours', 'facility']:
-                continue
-            data[key] = val
-
-        # -------------------------------------------------------
-        # [Step 2] 운영 시간 조회
-        # -------------------------------------------------------
-        # 가장 단순하게 접근: "요일 정보가 있는 모든 행을 달라"
-        # 단, RDF 구조상 짝이 안 맞을 수 있으므로 최대한 긁어옵니다.
-        query_hours = f"""
-        SELECT ?day ?open ?close
-        WHERE {{
-            # Case 1: 시설 자체가 속성을 가진 경우
-            {{
-                <{clean_id}> ?pDay ?day .
-                FILTER (STRENDS(STR(?pDay), "dayOfWeek"))
-                
-                OPTIONAL {{ 
-                    <{clean_id}> ?pOpen ?open .
-                    FILTER (STRENDS(STR(?pOpen), "opens"))
-                }}
-                OPTIONAL {{ 
-                    <{clean_id}> ?pClose ?close .
-                    FILTER (STRENDS(STR(?pClose), "closes"))
-                }}
-            }}
-            UNION
-            # Case 2: 별도 노드로 연결된 경우
-            {{
-                ?hoursNode ?pFac <{clean_id}> .
-                ?hoursNode ?pDay ?day .
-                FILTER (STRENDS(STR(?pDay), "dayOfWeek"))
-                
-                OPTIONAL {{ 
-                    ?hoursNode ?pOpen ?open .
-                    FILTER (STRENDS(STR(?pOpen), "opens"))
-                }}
-                OPTIONAL {{ 
-                    ?hoursNode ?pClose ?close .
-                    FILTER (STRENDS(STR(?pClose), "closes"))
-                }}
-            }}
-        }}
-        """
-        
-        sparql.setQuery(query_hours)
-        results_hours = sparql.query().convert()
-        
-        hours_list = []
-        day_order = { 
-            "Monday":1, "Tuesday":2, "Wednesday":3, "Thursday":4, "Friday":5, "Saturday":6, "Sunday":7,
-            "Mon":1, "Tue":2, "Wed":3, "Thu":4, "Fri":5, "Sat":6, "Sun":7 
-        }
+        # 스냅샷에 있으면 GraphDB 왕복 없이 mmap 에서 바로 읽고, 없으면 SPARQL 두 번
+        snap = get_snapshot()
+        detail = snap.facility_detail(clean_id) if snap is not None else None
+        if detail is not None:
+            data = {key: val for key, val in detail.items() if key not in HOURS_KEYS}
+            hour_rows = [(r["day"], r["opens"], r["closes"]) for r in snap.hours(clean_id)]
+        else:
+            data, hour_rows = _facility_detail_from_sparql(clean_id)
 
-        bindings = results_hours["results"]["bindings"]
-        
-        for res in bindings:
-            day_full = res["day"]["value"]
+        hours_list = []
+        for day_full, open_value, close_value in hour_rows:
             day = day_full.split('/')[-1] if '/' in day_full else day_full
             
-            open_time = res.get("open", {}).get("value", "")[:5]
-            close_time = res.get("close", {}).get("value", "")[:5]
+            open_time = (open_value or "")[:5]
+            close_time = (close_value or "")[:5]
             
             time_str = f"{open_time} ~ {close_time}" if open_time else "시간 정보 없음"
             
             hours_list.append({
-                "order": day_order.get(day, 99),
+                "order": DAY_ORDER.get(day, 99),
                 "text": f"{day}: {time_str}"
             })
 
@@ -215,64 +127,120 @@ def get_facility_detail():
     except Exception as e:
         print(f"[ERROR] {e}")
         return jsonify({"error": str(e)}), 500
+
+
+def _facility_detail_from_sparql(clean_id):
+    """GraphDB 에서 (기본 정보 dict, [(요일, 여는 시각, 닫는 시각), ...]) 조회"""
+    sparql = get_sparql(GRAPHDB_URL)
+
+    # -------------------------------------------------------
+    # [Step 1] 기본 정보 조회 (시간 정보 제외)
+    # -------------------------------------------------------
+    query_basic = f"SELECT ?p ?o WHERE {{ <{clean_id}> ?p ?o . }}"
+    sparql.setQuery(query_basic)
+    results_basic = sparql.query().convert()
+
+    data = {}
+    for result in results_basic["results"]["bindings"]:
+        pred_uri = result["p"]["value"]
+        val = result["o"]["value"]
+        key = pred_uri.split('#')[-1].split('/')[-1]
+        
+        # 시간 관련 키는 무시 (덮어쓰기 방지)
+        if key in HOURS_KEYS:
+            continue
+        data[key] = val
+
+    # -------------------------------------------------------
+    # [Step 2] 운영 시간 조회
+    # -------------------------------------------------------
+    # 가장 단순하게 접근: "요일 정보가 있는 모든 행을 달라"
+    # 단, RDF 구조상 짝이 안 맞을 수 있으므로 최대한 긁어옵니다.
+    query_hours = f"""
+    SELECT ?day ?open ?close
+    WHERE {{
+        # Case 1: 시설 자체가 속성을 가진 경우
+        {{
+            <{clean_id}> ?pDay ?day .
+            FILTER (STRENDS(STR(?pDay), "dayOfWeek"))
+            
+            OPTIONAL {{ 
+                <{clean_id}> ?pOpen ?open .
+                FILTER (STRENDS(STR(?pOpen), "opens"))
+            }}
+            OPTIONAL {{ 
+                <{clean_id}> ?pClose ?close .
+                FILTER (STRENDS(STR(?pClose), "closes"))
+            }}
+        }}
+        UNION
+        # Case 2: 별도 노드로 연결된 경우
+        {{
+            ?hoursNode ?pFac <{clean_id}> .
+            ?hoursNode ?pDay ?day .
+            FILTER (STRENDS(STR(?pDay), "dayOfWeek"))
+            
+            OPTIONAL {{ 
+                ?hoursNode ?pOpen ?open .
+                FILTER (STRENDS(STR(?pOpen), "opens"))
+            }}
+            OPTIONAL {{ 
+                ?hoursNode ?pClose ?close .
+                FILTER (STRENDS(STR(?pClose), "closes"))
+            }}
+        }}
+    }}
+    """
+    
+    sparql.setQuery(query_hours)
+    results_hours = sparql.query().convert()
+
+    hour_rows = [(res["day"]["value"], res.get("open", {}).get("value"), res.get("close", {}).get("value"))
+                 for res in results_hours["results"]["bindings"]]
+    return data, hour_rows
+
+
 # ========== API 라우트 ==========
 def get_graphdb_context(keyword):
     """
     GraphDB를 검색하고, 어떤 파일(출처)에서 데이터를 가져왔는지 로그를 남깁니다.
+    후보 문단은 순위/근사 중복 제거/토큰 예산을 거쳐 (컨텍스트 문자열, 추정 토큰 수)로 반환합니다.
     """
     print(f"\n🕵️ [GraphDB] '{keyword}' 관련 지식 탐색 시작 (순환 점검 중)...")
     
+    # 순위를 매길 수 있도록 후보는 넉넉히 가져오고, 실제 길이는 토큰 예산으로 제한
     query = f"""
     SELECT ?s ?p ?o
     WHERE {{
         ?s ?p ?o .
         FILTER regex(str(?o), "{keyword}")
     }}
-    LIMIT 50
+    LIMIT 100
     """
     
+    sparql = get_sparql(SPARQL_ENDPOINT)
     sparql.setQuery(query)
-    sparql.setReturnFormat(JSON)
     
     try:
         results = sparql.query().convert()
-        
-        context_text = ""
-        seen_uris = set()
-        
-        # 📊 [디버그용] 출처별 데이터 개수 카운터
-        source_tracker = {
-            "File_A (증상 목록)": 0,
-            "File_B (질병 백과)": 0,
-            "File_C (메타 데이터)": 0
-        }
-
-        for r in results["results"]["bindings"]:
-            uri = r['s']['value']
-            # 오타 수정
-            uri = uri.replace("knowlefgemap", "knowledgemap")
-            content = r['o']['value'].strip()
-            
-            if uri not in seen_uris:
-                # --- [순환 점검 로직] URI 패턴으로 출처 파악 ---
-                if "/medical/condition/" in uri:
-                    source_tracker["File_A (증상 목록)"] += 1
-                elif "/koah/disease/" in uri:
-                    source_tracker["File_B (질병 백과)"] += 1
-                elif "/koah/" in uri: # disease 없이 숫자만 있는 경우
-                    source_tracker["File_C (메타 데이터)"] += 1
-                # ---------------------------------------------
-
-                clean_content = content.replace("\n", " ").replace("#", "")
-                context_text += f"- {clean_content}\n"
-                seen_uris.add(uri)
+        bindings = results["results"]["bindings"]
+
+        ranked = rank_passages(bindings, keyword)
+        selected, context_tokens = select_passages(ranked)
+
+        # 📊 [디버그용] 출처별 데이터 개수 카운터 (실제 프롬프트에 들어간 문단 기준)
+        source_tracker = {key: 0 for key in SOURCES}
+        for passage in selected:
+            if passage.source:
+                source_tracker[passage.source] += 1
         
         # 📢 [디버그 출력] 터미널에 순환 결과 보고
         print("-" * 50)
         print(f"📊 [순환 학습 증거 확보] '{keyword}' 검색 결과 출처 분석:")
-        print(f"   📂 A파일 (증상코드): {source_tracker['File_A (증상 목록)']}개 참조함")
-        print(f"   📂 B파일 (질병설명): {source_tracker['File_B (질병 백과)']}개 참조함")
-        print(f"   📂 C파일 (태그정보): {source_tracker['File_C (메타 데이터)']}개 참조함")
+        print(f"   📂 A파일 (증상코드): {source_tracker['A']}개 참조함")
+        print(f"   📂 B파일 (질병설명): {source_tracker['B']}개 참조함")
+        print(f"   📂 C파일 (태그정보): {source_tracker['C']}개 참조함")
+        print(f"   ✂️ 후보 {len(bindings)}개 → 중복 제거/예산 적용 후 {len(selected)}개 (약 {context_tokens} 토큰)")
         
         total_found = sum(source_tracker.values())
         if total_found > 0:
@@ -281,11 +249,11 @@ def get_graphdb_context(keyword):
             print("⚠️ 검색된 데이터가 없습니다.")
         print("-" * 50)
 
-        return context_text
+        return format_context(selected), context_tokens
 
     except Exception as e:
         print(f"❌ [GraphDB] 오류 발생: {e}")
-        return ""
+        return "", 0
 
 
 # ========== API 라우트 ==========
@@ -303,45 +271,30 @@ def chat():
 
         # [1] 키워드 추출
         db_context = ""
-        search_keyword = ""
+        context_tokens = 0
         
-        # 간단 키워드 매칭 (확장 가능)
-        if "구토" in user_message: search_keyword = "구토"
-        elif "설사" in user_message: search_keyword = "설사"
-        elif "기침" in user_message: search_keyword = "기침"
+        # 간단 키워드 매칭 (확장 가능: chat_context.SYMPTOM_KEYWORDS)
+        search_keyword = next((k for k in SYMPTOM_KEYWORDS if k in user_message), "")
             
         # [2] GraphDB 검색 (위의 수정된 함수 호출)
         if search_keyword:
-            db_context = get_graphdb_context(search_keyword)
+            db_context, context_tokens = get_graphdb_context(search_keyword)
 
-        # [3] 프롬프트 구성
-        base_prompt = """
-        너는 유기동물 보호 및 입양 플랫폼 '애니멀루(Animalloo)'의 친절한 AI 챗봇이야.
-        
-        [지시사항]
-        1. 아래 제공된 [수의학 데이터베이스 정보]를 바탕으로 답변해.
-        2. 너의 환각 증세를 0%로 만들어야해 절대 너는 [수의학 데이터베이스 정보] 외 다른 곳에서 정보를 가져오면 안돼.
-        3. 만약 [수의학 데이터베이스 정보]에서 정보가 없으면 임의로 답변하지말고 솔직하게 데이터가 없다고 답변해.
-        4. 친근한 말투(해요체)와 이모지를 사용해.
-        5. 대답은 6줄 이내로 핵심만 요약해서 적어줘.
-        6. 의학적 진단은 피하고, 병원 방문을 권유해.
-        7. 마지막에 너가 [수의학 데이터베이스 정보]에서 어떤 데이터 베이스를 참조해왔는지 꼭 말해줘
-        """
-        
-        context_section = ""
-        if db_context:
-            context_section = f"""
-            \n[수의학 데이터베이스 정보]
-            {db_context}
-            """
-        
-        full_message = f"{base_prompt}{context_section}\n\n사용자 질문: {user_message}"
+        # [3] 프롬프트 구성 (고정 지시문은 system instruction 으로 모델에 한 번만 설정)
+        user_prompt = build_user_prompt(user_message, db_context)
 
         # [4] Gemini 호출
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.5-flash') 
+        model = get_chat_model(api_key, 'gemini-2.5-flash', system_instruction=SYSTEM_INSTRUCTION)
         
-        response = model.generate_content(full_message)
+        with upstream_call("gemini"):
+            response = model.generate_content(user_prompt)
+
+        # 📏 요청당 프롬프트 토큰 수 기록 (usage_metadata 가 없으면 추정치)
+        usage = getattr(response, "usage_metadata", None)
+        prompt_tokens = getattr(usage, "prompt_token_count", 0) or \
+            estimate_tokens(SYSTEM_INSTRUCTION) + estimate_tokens(user_prompt)
+        prompt_token_stats.record(prompt_tokens, context_tokens)
+        print(f"📏 [프롬프트] {prompt_tokens} 토큰 (컨텍스트 약 {context_tokens})")
 
         if not response.text:
             return jsonify({'error': '응답이 없습니다.'}), 500
@@ -352,7 +305,6 @@ def chat():
         print(f"에러 발생: {e}")
         return jsonify({'error': str(e)}), 500
     
-kg = KnowledgeGraph()
 @app.route('/api/animals', methods=['GET'])
 def get_animals():
     # 1. 서울시 API 호출 (기존 코드 유지)
@@ -361,10 +313,11 @@ def get_animals():
     start_index = request.args.get('start', 1)
     end_index = request.args.get('end', 50)
     
-    url = f"http://openapi.seoul.go.kr:8088/{SEOUL_API_KEY}/json/{SERVICE_NAME}/{start_index}/{end_index}/"
+    SEOUL_API_BASE = os.getenv('SEOUL_API_BASE', 'http://openapi.seoul.go.kr:8088')
+    url = f"{SEOUL_API_BASE}/{SEOUL_API_KEY}/json/{SERVICE_NAME}/{start_index}/{end_index}/"
     
     try:
-        response = requests.get(url)
+        response = get_http_session().get(url)
         data = response.json()
         
         if SERVICE_NAME in data:
@@ -375,44 +328,22 @@ def get_animals():
             
             # 성능을 위해 한 번 조회한 URI 정보는 캐싱(임시 저장)하는 것이 좋습니다.
             uri_cache = {} 
-            
-            for item in rows:
-                # [수정] 올바른 필드명(ANIMAL_TYPE) 사용
-                # 예: "[개] 믹스견" 또는 "개" 등의 값이 들어올 것으로 예상됩니다.
-                kind_text = item.get('ANIMAL_TYPE', '') 
-                
-                # (혹시 ANIMAL_TYPE이 비어있으면 ANIMAL_BREED도 확인하도록 보완)
-                if not kind_text:
-                    kind_text = item.get('ANIMAL_BREED', '')
-
 
-                # 매핑 시도
-                animal_uri = map_text_to_uri(kind_text, ANIMAL_MAP)
+            # ANIMAL_TYPE / ANIMAL_BREED 를 페이지 단위로 한 번에 정규화 (종 URI + 표준 품종)
+            species_list = classify_rows(rows)
+            
+            for item, info in zip(rows, species_list):
+                animal_uri = info.species_uri
 
                 enrichment_info = {
+                    "species": info.species,
+                    "breed": info.breed,
                     "medical_risks": []
                 }
 
                 if animal_uri:
                     if animal_uri not in uri_cache:
-                        
-                        medical_data = kg.get_medical_info_by_animal(animal_uri)
-                        
-                        risk_list = []
-                        for binding in medical_data:
-                            # 1. 질병 이름 안전하게 가져오기
-                            d_name = binding.get('diseaseName', {}).get('value', '알 수 없는 질병')
-                            
-                            # 2. 증상 이름 안전하게 가져오기 (증상도 없을 수 있으니 대비)
-                            s_name = binding.get('symptomName', {}).get('value', '')
-                            
-                            if s_name:
-                                risk_list.append(f"{d_name} ({s_name})")
-                            else:
-                                risk_list.append(d_name)
-                        
-                        uri_cache[animal_uri] = risk_list
-                        uri_cache[animal_uri] = risk_list
+                        uri_cache[animal_uri] = _medical_risks(animal_uri)
                     
                     enrichment_info["medical_risks"] = uri_cache[animal_uri]
 
@@ -434,6 +365,30 @@ def get_animals():
         print(f"Error: {e}")
         return jsonify({'error': str(e)}), 500
     
+def _medical_risks(animal_uri):
+    """동물 URI 의 질병 목록 ("질병 (증상)" 문자열). 스냅샷 우선, 없으면 SPARQL"""
+    snap = get_snapshot()
+    if snap is not None:
+        return [f"{r['disease']} ({r['symptom']})" if r['symptom'] else r['disease']
+                for r in snap.medical_info(animal_uri)]
+
+    medical_data = get_knowledge_graph().get_medical_info_by_animal(animal_uri)
+    
+    risk_list = []
+    for binding in medical_data:
+        # 1. 질병 이름 안전하게 가져오기
+        d_name = binding.get('diseaseName', {}).get('value', '알 수 없는 질병')
+        
+        # 2. 증상 이름 안전하게 가져오기 (증상도 없을 수 있으니 대비)
+        s_name = binding.get('symptomName', {}).get('value', '')
+        
+        if s_name:
+            risk_list.append(f"{d_name} ({s_name})")
+        else:
+            risk_list.append(d_name)
+    return risk_list
+
+
 @app.route('/api/stats/pet-names', methods=['GET'])
 def get_pet_names():
     gu_name = request.args.get('gu')
@@ -441,22 +396,30 @@ def get_pet_names():
         return jsonify({'error': '구 이름이 필요합니다.'}), 400
 
     try:
-        # SPARQL로 통계 조회
-        results = kg.get_pet_names_by_gu(gu_name)
-        
-        # 프론트엔드에서 쓰기 편하게 포맷팅
-        stats = []
-        for item in results:
-            stats.append({
-                "name": item['name']['value'],
-                "count": int(item['count']['value'])
-            })
-            
-        return jsonify(stats), 200
+        return cached_json("pet-names", (gu_name,), lambda: _load_pet_names(gu_name))
 
     except Exception as e:
         print(f"통계 조회 에러: {e}")
         return jsonify({'error': str(e)}), 500
+
+
+def _load_pet_names(gu_name):
+    # 스냅샷 우선
+    snap = get_snapshot()
+    if snap is not None:
+        return snap.pet_names(gu_name)
+
+    # SPARQL로 통계 조회
+    results = get_knowledge_graph().get_pet_names_by_gu(gu_name)
+    
+    # 프론트엔드에서 쓰기 편하게 포맷팅
+    stats = []
+    for item in results:
+        stats.append({
+            "name": item['name']['value'],
+            "count": int(item['count']['value'])
+        })
+    return stats
     
     
 #====검색엔진======
@@ -557,7 +520,7 @@ def search_graphdb():
         PREFIX schema: <http://schema.org/>
         PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
         
-        SELECT DISTINCT ?subject ?label ?type ?address ?tel ?description ?category
+        SELECT DISTINCT ?subject ?label ?type ?address ?tel ?description ?category ?lat ?lng
         WHERE {{
             ?subject a koah:AnimalFacility ;
                      rdfs:label ?label ;
@@ -568,6 +531,7 @@ def search_graphdb():
             OPTIONAL {{ ?subject schema:streetAddress ?address . }}
             OPTIONAL {{ ?subject schema:telephone ?tel . }}
             OPTIONAL {{ ?subject schema:description ?description . }}
+            OPTIONAL {{ ?subject schema:latitude ?lat ; schema:longitude ?lng . }}
             
             BIND("{matched_category_uri}" AS ?type)
             BIND("복합조건(위치+카테고리)" AS ?category)
@@ -585,7 +549,7 @@ def search_graphdb():
         PREFIX schema: <http://schema.org/>
         PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
         
-        SELECT DISTINCT ?subject ?label ?type ?address ?tel ?description ?category
+        SELECT DISTINCT ?subject ?label ?type ?address ?tel ?description ?category ?lat ?lng
         WHERE {{
             ?subject a koah:AnimalFacility ;
                      rdfs:label ?label ;
@@ -594,6 +558,7 @@ def search_graphdb():
             OPTIONAL {{ ?subject schema:streetAddress ?address . }}
             OPTIONAL {{ ?subject schema:telephone ?tel . }}
             OPTIONAL {{ ?subject schema:description ?description . }}
+            OPTIONAL {{ ?subject schema:latitude ?lat ; schema:longitude ?lng . }}
             
             BIND("{matched_category_uri}" AS ?type)
             BIND("카테고리기반" AS ?category)
@@ -611,7 +576,7 @@ def search_graphdb():
         PREFIX schema: <http://schema.org/>
         PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
         
-        SELECT DISTINCT ?subject ?label ?type ?address ?tel ?description ?category
+        SELECT DISTINCT ?subject ?label ?type ?address ?tel ?description ?category ?lat ?lng
         WHERE {{
             ?subject a koah:AnimalFacility ;
                      rdfs:label ?label ;
@@ -620,6 +585,7 @@ def search_graphdb():
             OPTIONAL {{ ?subject schema:streetAddress ?address . }}
             OPTIONAL {{ ?subject schema:telephone ?tel . }}
             OPTIONAL {{ ?subject schema:description ?description . }}
+            OPTIONAL {{ ?subject schema:latitude ?lat ; schema:longitude ?lng . }}
             
             BIND("AnimalFacility" AS ?type)
             BIND("위치기반" AS ?category)
@@ -638,7 +604,7 @@ def search_graphdb():
         PREFIX schema: <http://schema.org/>
         PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
         
-        SELECT DISTINCT ?subject ?label ?type ?address ?tel ?description ?category
+        SELECT DISTINCT ?subject ?label ?type ?address ?tel ?description ?category ?lat ?lng
         WHERE {{
             {{
                 ?subject a koah:AnimalFacility ;
@@ -646,6 +612,7 @@ def search_graphdb():
                 OPTIONAL {{ ?subject schema:streetAddress ?address . }}
                 OPTIONAL {{ ?subject schema:telephone ?tel . }}
                 OPTIONAL {{ ?subject schema:description ?description . }}
+                OPTIONAL {{ ?subject schema:latitude ?lat ; schema:longitude ?lng . }}
                 BIND("직접매칭" AS ?category)
                 FILTER(CONTAINS(LCASE(?label), LCASE("{safe_keyword}")))
             }}
@@ -655,6 +622,7 @@ def search_graphdb():
                          rdfs:label ?label ;
                          schema:streetAddress ?address .
                 OPTIONAL {{ ?subject schema:telephone ?tel . }}
+                OPTIONAL {{ ?subject schema:latitude ?lat ; schema:longitude ?lng . }}
                 BIND("주소기반" AS ?category)
                 FILTER(CONTAINS(LCASE(?address), LCASE("{safe_keyword}")))
             }}
@@ -663,8 +631,8 @@ def search_graphdb():
         """
     
     try:
+        sparql = get_sparql(SPARQL_ENDPOINT)
         sparql.setQuery(query)
-        sparql.setReturnFormat(JSON)
         results = sparql.query().convert()
         
         search_results = []
@@ -684,6 +652,13 @@ def search_graphdb():
             
             if type_val.startswith("koah:"):
                 type_val = type_val.replace("koah:", "")
+
+            # 좌표: 그래프의 schema:latitude/longitude → 없으면 오프라인 지오코딩 캐시
+            if "lat" in binding and "lng" in binding:
+                coords = (float(binding["lat"]["value"]), float(binding["lng"]["value"]))
+            else:
+                coords = geocode_cache.lookup(address)
+            lat, lng = coords if coords else (None, None)
                 
             search_results.append({
                 "uri": uri,
@@ -693,8 +668,9 @@ def search_graphdb():
                 "category": category,
                 "address": address,
                 "tel": tel,
-                # 지도 이동을 위해 좌표가 필요하지만 SPARQL 결과에 없다면 
-                # 프론트엔드의 Geocoder가 처리하도록 둠 (address 필수)
+                # 좌표를 끝내 못 찾은 경우(None)만 프론트엔드 Geocoder 가 address 로 처리
+                "lat": lat,
+                "lng": lng,
             })
             
         print(f"✅ [검색 완료] {len(search_results)}건 발견")
@@ -714,4 +690,5 @@ def search_graphdb():
 
 
 if __name__ == '__main__':
+    get_snapshot()
     app.run(debug=True, port=5001)
\ No newline at end of file
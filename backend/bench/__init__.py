@@ -0,0 +1,6 @@
+"""
+백엔드 벤치마크 도구
+
+GraphDB / 서울시 Open API / Gemini 없이도 모든 엔드포인트의 성능을 재현 가능하게 측정합니다.
+    python -m bench.run_bench --help
+"""
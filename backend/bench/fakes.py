@@ -0,0 +1,211 @@
+"""
+벤치마크용 가짜 외부 서비스
+
+- SparqlServer : rdflib 메모리 그래프를 SPARQL 1.1 Protocol(GET/POST, JSON 결과)로 제공 → GraphDB 대체
+- SeoulApiServer : 서울시 Open API vPetInfo 형식 응답
+- GeminiServer : Gemini REST generateContent 형식 응답 (고정 지연 후 짧은 답변)
+
+모두 표준 라이브러리 ThreadingHTTPServer 위에서 백그라운드 스레드로 동작합니다.
+지연(latency_ms)을 주면 실제 네트워크 왕복 시간을 흉내 냅니다.
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # 요청 로그는 벤치마크 출력에 섞이지 않게 끔
+        pass
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status, body, content_type="application/json; charset=utf-8"):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _FakeServer:
+    """ThreadingHTTPServer 를 데몬 스레드로 띄우는 공통 부분"""
+
+    handler = _Handler
+
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0):
+        self.latency = latency_ms / 1000.0
+        self.requests = 0
+        self._count_lock = threading.Lock()
+        handler = type(self.handler.__name__, (self.handler,), {"server_ref": self})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self):
+        with self._count_lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# ============================================================
+# SPARQL (GraphDB 대체)
+# ============================================================
+
+class _SparqlHandler(_Handler):
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        self._answer(params.get("query", [None])[0])
+
+    def do_POST(self):
+        body = self._read_body().decode("utf-8")
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("application/sparql-query"):
+            query = body
+        else:
+            query = parse_qs(body).get("query", [None])[0]
+        self._answer(query)
+
+    def _answer(self, query):
+        if not query:
+            self._send(400, b"missing query", "text/plain")
+            return
+        server = self.server_ref
+        server.count()
+        try:
+            body = server.run_query(query)
+        except Exception as e:
+            self._send(400, f"query error: {e}".encode("utf-8"), "text/plain; charset=utf-8")
+            return
+        self._send(200, body, "application/sparql-results+json; charset=utf-8")
+
+
+class SparqlServer(_FakeServer):
+    """rdflib 그래프에 대한 읽기 전용 SPARQL 엔드포인트.
+    rdflib 의 쿼리 파서(pyparsing)는 스레드 안전하지 않아 쿼리 실행은 잠금으로 직렬화합니다.
+    (지연 시간 sleep 은 잠금 밖이므로 동시 요청의 네트워크 대기는 겹칠 수 있음)"""
+
+    handler = _SparqlHandler
+
+    def __init__(self, graph, **kwargs):
+        super().__init__(**kwargs)
+        self.graph = graph
+        self._query_lock = threading.Lock()
+
+    @property
+    def endpoint(self):
+        return f"{self.url}/repositories/knowledgemap"
+
+    def run_query(self, query):
+        with self._query_lock:
+            result = self.graph.query(query)
+            return result.serialize(format="json")
+
+
+# ============================================================
+# 서울시 Open API (vPetInfo)
+# ============================================================
+
+class _SeoulHandler(_Handler):
+    # /{KEY}/json/{SERVICE}/{START}/{END}/
+    PATH = re.compile(r"^/[^/]+/json/(?P<service>[^/]+)/(?P<start>\d+)/(?P<end>\d+)/?$")
+
+    def do_GET(self):
+        server = self.server_ref
+        server.count()
+        match = self.PATH.match(urlparse(self.path).path)
+        if not match or match["service"] != "vPetInfo":
+            self._send(200, {"RESULT": {"CODE": "INFO-200", "MESSAGE": "해당하는 데이터가 없습니다."}})
+            return
+        start, end = int(match["start"]), int(match["end"])
+        rows = server.rows[max(start - 1, 0):end]
+        self._send(200, {"vPetInfo": {
+            "list_total_count": len(server.rows),
+            "RESULT": {"CODE": "INFO-000", "MESSAGE": "정상 처리되었습니다"},
+            "row": rows,
+        }})
+
+
+class SeoulApiServer(_FakeServer):
+    handler = _SeoulHandler
+
+    def __init__(self, rows, **kwargs):
+        super().__init__(**kwargs)
+        self.rows = rows
+
+
+# ============================================================
+# Gemini REST (generateContent)
+# ============================================================
+
+class _GeminiHandler(_Handler):
+    PATH = re.compile(r"^/v1beta/models/(?P<model>[^:]+):generateContent$")
+
+    def do_POST(self):
+        server = self.server_ref
+        body = self._read_body()
+        match = self.PATH.match(urlparse(self.path).path)
+        if not match:
+            self._send(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+            return
+        server.count()
+
+        request = json.loads(body or b"{}")
+        prompt = "".join(part.get("text", "")
+                         for content in request.get("contents", [])
+                         for part in content.get("parts", []))
+        system = "".join(part.get("text", "")
+                         for part in (request.get("systemInstruction") or {}).get("parts", []))
+        server.record_prompt(len(system) + len(prompt))
+
+        text = "데이터베이스 정보를 바탕으로 답변드려요 🐶 증상이 계속되면 동물병원에 꼭 방문해 주세요. (참조: File_B)"
+        # 한글 위주 프롬프트라 글자 수를 그대로 토큰 수 근사치로 사용
+        prompt_tokens = len(system) + len(prompt)
+        self._send(200, {
+            "candidates": [{
+                "content": {"role": "model", "parts": [{"text": text}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": len(text),
+                "totalTokenCount": prompt_tokens + len(text),
+            },
+            "modelVersion": match["model"],
+        })
+
+
+class GeminiServer(_FakeServer):
+    handler = _GeminiHandler
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.prompt_chars_total = 0
+
+    def record_prompt(self, chars):
+        with self._count_lock:
+            self.prompt_chars_total += chars
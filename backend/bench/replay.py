@@ -0,0 +1,198 @@
+"""
+수집한 트래픽 트레이스 재생 (부하 테스트)
+
+traffic_capture.py 가 남긴 gzip JSON Lines 파일을 원래 도착 간격대로(또는 배속으로) 로컬 인스턴스에 다시 보내고
+라우트별 지연 시간 분포, 오류율, 차단(429/503) 비율을 보고합니다.
+
+    python -m bench.replay data/traffic.*.jsonl.gz --target http://127.0.0.1:5001 --speed 10 --concurrency 32
+    python -m bench.replay data/traffic.*.jsonl.gz --speed 0 --route /api/search --out replay.json
+
+--speed  1 = 실제 속도, 10 = 10배 빠르게, 0 = 간격 무시하고 최대한 빠르게
+재생 시 클라이언트 id 는 X-Forwarded-For 가상 주소로, 조건부 요청은 직전에 받은 ETag 로 보냅니다.
+"""
+import argparse
+import gzip
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from bench.run_bench import percentile, send_request
+
+CHAT_TEMPLATE = "우리 강아지가 {keyword} 증상을 보여요. 어떻게 해야 하나요?"
+CHAT_FALLBACK = "우리 강아지가 요즘 기운이 없어요."
+
+
+def load_traces(paths, routes=None, limit=None):
+    """여러 워커 파일을 합쳐 시각순으로 정렬한 트레이스 목록"""
+    traces = []
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # 강제 종료로 잘린 마지막 줄 등
+                if routes and record.get("r") not in routes:
+                    continue
+                traces.append(record)
+    traces.sort(key=lambda r: r["t"])
+    return traces[:limit] if limit else traces
+
+
+def to_request(record):
+    """트레이스 한 줄 → (method, path, body)"""
+    method, route, params = record["m"], record["r"], record.get("p") or {}
+    if route == "/api/chat":
+        keyword = params.get("keyword")
+        message = CHAT_TEMPLATE.format(keyword=keyword) if keyword else CHAT_FALLBACK
+        return method, route, {"message": message}
+    if method == "GET":
+        return method, f"{route}?{urlencode(params)}" if params else route, None
+    return method, route, params
+
+
+def client_address(client):
+    """익명 클라이언트 id(16진수) → 고정된 가상 IP (같은 클라이언트는 같은 주소)"""
+    client = (client or "000000").ljust(6, "0")
+    return f"10.{int(client[0:2], 16)}.{int(client[2:4], 16)}.{int(client[4:6], 16)}"
+
+
+def _summarize(latencies, statuses):
+    latencies.sort()
+    total = len(latencies)
+    shed = statuses.get("429", 0) + statuses.get("503", 0)
+    errors = sum(n for status, n in statuses.items()
+                 if status == "0" or (status.startswith("5") and status != "503"))
+    return {
+        "requests": total,
+        "status": dict(sorted(statuses.items())),
+        "error_rate": round(errors / total, 4) if total else 0.0,
+        "shed_rate": round(shed / total, 4) if total else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p90_ms": round(percentile(latencies, 90), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+def replay(traces, target, speed, concurrency, timeout):
+    etags = {}
+    results = []          # (route, 지연 ms, 상태, 예정 대비 지연 ms)
+    lock = threading.Lock()
+    started = time.perf_counter()
+    t0 = traces[0]["t"]
+
+    def one(record, due):
+        lag = max(0.0, (time.perf_counter() - started) - due) * 1000.0
+        method, path, body = to_request(record)
+        headers = {"X-Forwarded-For": client_address(record.get("c"))}
+        if record.get("n") and path in etags:
+            headers["If-None-Match"] = etags[path]
+        ms, status, etag = send_request(target, method, path, body, timeout, headers)
+        if etag:
+            etags[path] = etag
+        with lock:
+            results.append((record["r"], ms, status, lag))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for record in traces:
+            due = (record["t"] - t0) / speed if speed > 0 else 0.0
+            wait = due - (time.perf_counter() - started)
+            if wait > 0:
+                time.sleep(wait)
+            pool.submit(one, record, due)
+    elapsed = time.perf_counter() - started
+
+    by_route = {}
+    for route, ms, status, _ in results:
+        latencies, statuses = by_route.setdefault(route, ([], {}))
+        latencies.append(ms)
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    all_statuses = {}
+    for _, statuses in by_route.values():
+        for status, n in statuses.items():
+            all_statuses[status] = all_statuses.get(status, 0) + n
+    overall = _summarize([ms for _, ms, _, _ in results], all_statuses)
+    overall["rps"] = round(len(results) / elapsed, 1) if elapsed else 0.0
+    lags = sorted(lag for _, _, _, lag in results)
+    overall["schedule_lag_p99_ms"] = round(percentile(lags, 99), 2)
+
+    return {
+        "overall": overall,
+        "routes": {route: _summarize(latencies, statuses)
+                   for route, (latencies, statuses) in sorted(by_route.items())},
+        "elapsed_s": round(elapsed, 2),
+    }
+
+
+def captured_summary(traces):
+    """수집 당시 라우트별 서버 처리 시간과 업스트림 호출 수 (재생 결과와 비교용)"""
+    by_route = {}
+    for record in traces:
+        entry = by_route.setdefault(record["r"], {"d": [], "upstream": 0})
+        entry["d"].append(record.get("d", 0.0))
+        entry["upstream"] += len(record.get("u") or ())
+    return {
+        route: {
+            "p50_ms": round(percentile(sorted(e["d"]), 50), 2),
+            "p99_ms": round(percentile(sorted(e["d"]), 99), 2),
+            "upstream_calls_avg": round(e["upstream"] / len(e["d"]), 2),
+        }
+        for route, e in sorted(by_route.items())
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="수집한 트래픽 트레이스 재생")
+    parser.add_argument("paths", nargs="+", help="traffic_capture 파일 (*.jsonl.gz)")
+    parser.add_argument("--target", default="http://127.0.0.1:5001")
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 배속 (0 = 최대한 빠르게)")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시에 보낼 수 있는 최대 요청 수")
+    parser.add_argument("--route", action="append", help="특정 라우트만 (여러 번 지정 가능)")
+    parser.add_argument("--limit", type=int, default=None, help="앞에서부터 N개만")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    traces = load_traces(args.paths, routes=set(args.route or ()), limit=args.limit)
+    if not traces:
+        print("⚠️ 재생할 트레이스가 없습니다.")
+        return 1
+    span = traces[-1]["t"] - traces[0]["t"]
+    print(f"▶️ [재생] {len(traces)}건 (원래 {span:.0f}초 분량) → {args.target}, "
+          f"{'최대 속도' if args.speed <= 0 else f'{args.speed:g}배속'}, 동시 {args.concurrency}")
+
+    report = replay(traces, args.target, args.speed, args.concurrency, args.timeout)
+    captured = captured_summary(traces)
+
+    print(f"   {'라우트':<24} {'요청':>6} {'p50':>9} {'p90':>9} {'p99':>9} {'오류':>7} {'차단':>7} {'수집 p50':>9}")
+    for route, stats in report["routes"].items():
+        print(f"   {route:<26} {stats['requests']:>6} {stats['p50_ms']:>7.1f}ms {stats['p90_ms']:>7.1f}ms "
+              f"{stats['p99_ms']:>7.1f}ms {stats['error_rate']:>7.1%} {stats['shed_rate']:>7.1%} "
+              f"{captured[route]['p50_ms']:>7.1f}ms")
+    overall = report["overall"]
+    print(f"   전체 {overall['requests']}건, {overall['rps']} req/s, p99 {overall['p99_ms']}ms, "
+          f"오류 {overall['error_rate']:.1%}, 차단 {overall['shed_rate']:.1%}, "
+          f"재생 지연 p99 {overall['schedule_lag_p99_ms']}ms")
+    if overall["schedule_lag_p99_ms"] > 1000:
+        print("⚠️ 재생기가 일정보다 1초 이상 밀렸습니다. --concurrency 를 늘리거나 --speed 를 낮추세요.")
+
+    if args.out:
+        report.update({
+            "captured": captured,
+            "meta": {"target": args.target, "speed": args.speed, "concurrency": args.concurrency,
+                     "traces": len(traces), "span_s": round(span, 1), "files": args.paths},
+        })
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 [재생] 결과 저장: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
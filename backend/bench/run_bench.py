@@ -0,0 +1,344 @@
+"""
+백엔드 엔드투엔드 벤치마크
+
+GraphDB / 서울시 Open API / Gemini 를 로컬 가짜 서버(bench/fakes.py)로 바꾸고,
+합성 지식 그래프(bench/synthetic_kg.py) 위에서 모든 엔드포인트의 지연 시간(p50/p90/p99)과 처리량을 측정합니다.
+결과는 git 커밋별 JSON 으로 저장되어 최적화 전후를 비교할 수 있습니다.
+
+    pip install -r bench/requirements.txt
+    python -m bench.run_bench run                       # 개발 서버(Flask), SPARQL 직접 조회
+    python -m bench.run_bench run --server gunicorn     # 운영 설정(gunicorn.conf.py)
+    python -m bench.run_bench run --snapshot            # mmap 스냅샷을 만들어 사용
+    python -m bench.run_bench run --admission           # 속도 제한/격리(admission.py) 켜고 측정
+    python -m bench.run_bench compare results/a1b2c3d-dev.json results/e4f5a6b-dev.json
+
+backend/ 디렉터리에서 실행합니다. 앱은 별도 프로세스로 뜨며 외부 네트워크를 쓰지 않습니다.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote, urlencode
+from urllib.request import Request, urlopen
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "bench", "results")
+
+
+def _scenarios(summary):
+    """이름 → 요청 생성 함수(i → (method, path, body)). i 로 구/시설을 돌아가며 바꿉니다."""
+    gu = summary["gu"]
+    ids = summary["facility_ids"]
+
+    def get(path, **params):
+        return "GET", f"{path}?{urlencode(params)}" if params else path, None
+
+    return {
+        "facilities": lambda i: get("/api/facilities", gu=gu[i % len(gu)]),
+        "facilities-filtered": lambda i: get("/api/facilities", gu=gu[i % len(gu)],
+                                             category="Cafe", open_at="2025-06-04T14:00"),
+        "facilities-bbox": lambda i: get("/api/facilities", bbox="37.50,126.95,37.60,127.10"),
+        "facility-detail": lambda i: get("/api/facility/detail", id=ids[(i * 7) % len(ids)]),
+        "facility-changes": lambda i: get("/api/facilities/changes"),
+        "search-gu-category": lambda i: get("/api/search", q=f"{gu[i % len(gu)]} 카페"),
+        "search-category": lambda i: get("/api/search", q="카페"),
+        "search-gu": lambda i: get("/api/search", q=gu[i % len(gu)]),
+        "search-keyword": lambda i: get("/api/search", q="행복한"),
+        "animals": lambda i: get("/api/animals", start=1 + (i % 4) * 50, end=50 + (i % 4) * 50),
+        "pet-names": lambda i: get("/api/stats/pet-names", gu=gu[i % len(gu)]),
+        "chat": lambda i: ("POST", "/api/chat",
+                           {"message": ["강아지가 구토를 해요", "고양이가 설사를 해요", "기침을 계속해요"][i % 3]}),
+    }
+
+
+def percentile(sorted_values, q):
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(q / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def send_request(base_url, method, path, body, timeout, headers=None):
+    """요청 한 번 → (지연 ms, 상태 코드, ETag). 연결 실패는 상태 0."""
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = Request(base_url + quote(path, safe="/?=&%:,"), data=data, method=method,
+                  headers={"Content-Type": "application/json", "Accept-Encoding": "gzip", **(headers or {})})
+    started = time.perf_counter()
+    etag = None
+    try:
+        with urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+            etag = resp.headers.get("ETag")
+    except HTTPError as e:
+        e.read()
+        status = e.code
+    except (URLError, OSError):
+        status = 0
+    return (time.perf_counter() - started) * 1000.0, status, etag
+
+
+def run_scenario(base_url, make_request, requests, concurrency, warmup, timeout):
+    for i in range(warmup):
+        send_request(base_url, *make_request(i), timeout)
+
+    def one(i):
+        return send_request(base_url, *make_request(warmup + i), timeout)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(ms for ms, _, _ in results)
+    statuses = {}
+    for _, status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(n for status, n in statuses.items() if not status.startswith(("2", "3")))
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "status": statuses,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p90_ms": round(percentile(latencies, 90), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "mean_ms": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+        "rps": round(requests / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+# ============================================================
+# 앱 프로세스
+# ============================================================
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_app(server, port, env, log_file, workers):
+    if server == "gunicorn":
+        env = dict(env, GUNICORN_BIND=f"127.0.0.1:{port}")
+        if workers:
+            env["GUNICORN_WORKERS"] = str(workers)
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"]
+    else:
+        # 리로더 없이 스레드 모드로 실행 (debug=True 의 리로더는 자식 프로세스를 또 띄움)
+        cmd = [sys.executable, "-c", f"from app import app; app.run(port={port}, threaded=True)"]
+    return subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+
+
+def _wait_ready(proc, base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            return False
+        try:
+            with urlopen(base_url + "/api/health", timeout=2) as resp:
+                if resp.status == 200:
+                    return True
+        except (URLError, OSError):
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def _git_revision():
+    try:
+        sha = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                      text=True, stderr=subprocess.DEVNULL).strip()
+        dirty = subprocess.check_output(["git", "status", "--porcelain", "--", "."], cwd=BACKEND_DIR,
+                                        text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return sha, bool(dirty)
+
+
+def run(args):
+    # rdflib 은 벤치마크 실행 시에만 필요 (compare / replay 는 표준 라이브러리만 사용)
+    from bench.fakes import GeminiServer, SeoulApiServer, SparqlServer
+    from bench.synthetic_kg import build_graph, fake_pet_rows
+
+    print(f"🧪 [벤치] 합성 지식 그래프 생성 (시설 {args.facilities}개, seed={args.seed})...")
+    graph, summary = build_graph(facilities=args.facilities, seed=args.seed)
+    print(f"   - 트리플 {summary['triples']}개")
+
+    sparql = SparqlServer(graph, latency_ms=args.sparql_latency_ms).start()
+    seoul = SeoulApiServer(fake_pet_rows(1000, seed=args.seed), latency_ms=args.api_latency_ms).start()
+    gemini = GeminiServer(latency_ms=args.llm_latency_ms).start()
+
+    workdir = tempfile.mkdtemp(prefix="kgbench-")
+    env = dict(
+        os.environ,
+        PYTHONUNBUFFERED="1",
+        GRAPHDB_URL=sparql.endpoint,
+        SEOUL_API_BASE=seoul.url,
+        SEOUL_API_KEY="bench",
+        GEMINI_API_ENDPOINT=gemini.url,
+        GEMINI_API_KEY="bench",
+        # 실제 data/ 디렉터리의 캐시 파일이 결과에 섞이지 않도록 모두 임시 디렉터리로
+        KG_SNAPSHOT_PATH=os.path.join(workdir, "kg_snapshot.bin"),
+        GEOCODE_DB_PATH=os.path.join(workdir, "geocode_cache.sqlite"),
+        FACILITY_CHANGELOG_PATH=os.path.join(workdir, "facility_changelog.json"),
+        # 모든 요청이 127.0.0.1 한 클라이언트에서 오므로 켜 두면 대부분 429/503 을 재게 됨
+        ADMISSION_CONTROL="1" if args.admission else "0",
+    )
+
+    # facility-changes 시나리오용 변경 이력. 스냅샷보다 먼저 만들어야 스냅샷 세대가 더 새로워
+    # --snapshot 일 때 /api/facilities 가 변경 이력이 아닌 스냅샷에서 응답함
+    subprocess.run([sys.executable, "facility_sync.py", "refresh"], cwd=BACKEND_DIR, env=env, check=True)
+    if args.snapshot:
+        subprocess.run([sys.executable, "snapshot.py", "build", "--out", env["KG_SNAPSHOT_PATH"]],
+                       cwd=BACKEND_DIR, env=env, check=True)
+
+    port = args.port or _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    log_path = os.path.join(workdir, "app.log")
+    sha, dirty = _git_revision()
+    scenarios = _scenarios(summary)
+    selected = args.scenario or list(scenarios)
+
+    results = {}
+    with open(log_path, "wb") as log_file:
+        proc = _start_app(args.server, port, env, log_file, args.workers)
+        try:
+            if not _wait_ready(proc, base_url):
+                print(f"❌ 앱이 시작되지 않았습니다. 로그: {log_path}")
+                return 1
+            print(f"🚀 [벤치] {args.server} 서버 준비 완료 ({base_url}), 커밋 {sha}{'-dirty' if dirty else ''}")
+
+            for name in selected:
+                stats = run_scenario(base_url, scenarios[name], args.requests, args.concurrency,
+                                     args.warmup, args.timeout)
+                results[name] = stats
+                print(f"   {name:<22} p50 {stats['p50_ms']:>8.1f}ms  p90 {stats['p90_ms']:>8.1f}ms  "
+                      f"p99 {stats['p99_ms']:>8.1f}ms  {stats['rps']:>7.1f} req/s  오류 {stats['errors']}")
+        finally:
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+            sparql.stop()
+            seoul.stop()
+            gemini.stop()
+
+    report = {
+        "meta": {
+            "commit": sha,
+            "dirty": dirty,
+            "server": args.server,
+            "snapshot": args.snapshot,
+            "admission": args.admission,
+            "facilities": args.facilities,
+            "triples": summary["triples"],
+            "seed": args.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "sparql_latency_ms": args.sparql_latency_ms,
+            "llm_latency_ms": args.llm_latency_ms,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": int(time.time()),
+        },
+        "upstream": {
+            "sparql_requests": sparql.requests,
+            "seoul_requests": seoul.requests,
+            "gemini_requests": gemini.requests,
+        },
+        "scenarios": results,
+    }
+
+    out = args.out
+    if not out:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        suffix = ("-snapshot" if args.snapshot else "") + ("-admission" if args.admission else "")
+        out = os.path.join(RESULTS_DIR, f"{sha}{'-dirty' if dirty else ''}-{args.server}{suffix}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 [벤치] 결과 저장: {out} (SPARQL 호출 {sparql.requests}회)")
+    return 0
+
+
+def compare(args):
+    """두 결과 파일의 시나리오별 p50/p99/처리량 비교. threshold(%) 이상 느려지면 종료 코드 1."""
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.head, encoding="utf-8") as f:
+        head = json.load(f)
+
+    def change(old, new):
+        return (new - old) / old * 100.0 if old else 0.0
+
+    print(f"📊 {base['meta']['commit']} → {head['meta']['commit']}")
+    print(f"   {'시나리오':<20} {'p50':>18} {'p99':>18} {'req/s':>18}")
+    regressions = []
+    for name, new in head["scenarios"].items():
+        old = base["scenarios"].get(name)
+        if old is None:
+            continue
+        p50, p99, rps = (change(old["p50_ms"], new["p50_ms"]), change(old["p99_ms"], new["p99_ms"]),
+                         change(old["rps"], new["rps"]))
+        flag = ""
+        if p50 > args.threshold or p99 > args.threshold or -rps > args.threshold:
+            flag = "  ⚠️"
+            regressions.append(name)
+        print(f"   {name:<22} {old['p50_ms']:>7.1f}→{new['p50_ms']:>7.1f}ms {p50:+5.0f}% "
+              f"{old['p99_ms']:>7.1f}→{new['p99_ms']:>7.1f}ms {p99:+5.0f}% "
+              f"{old['rps']:>6.0f}→{new['rps']:>6.0f} {rps:+5.0f}%{flag}")
+    if regressions:
+        print(f"⚠️ {args.threshold:.0f}% 이상 느려진 시나리오: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="백엔드 엔드투엔드 벤치마크 (로컬 가짜 GraphDB/API/LLM)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="벤치마크 실행")
+    p_run.add_argument("--server", choices=["dev", "gunicorn"], default="dev")
+    p_run.add_argument("--workers", type=int, default=None, help="gunicorn 워커 수 (기본: gunicorn.conf.py)")
+    p_run.add_argument("--snapshot", action="store_true", help="mmap 스냅샷을 만들어 사용")
+    p_run.add_argument("--admission", action="store_true",
+                       help="속도 제한/격리 켜기 (기본 끔, 단일 클라이언트라 429/503 이 섞임)")
+    p_run.add_argument("--facilities", type=int, default=2000)
+    p_run.add_argument("--seed", type=int, default=42)
+    p_run.add_argument("--requests", type=int, default=200, help="시나리오별 측정 요청 수")
+    p_run.add_argument("--concurrency", type=int, default=8)
+    p_run.add_argument("--warmup", type=int, default=10)
+    p_run.add_argument("--timeout", type=float, default=30.0)
+    p_run.add_argument("--sparql-latency-ms", type=float, default=5.0)
+    p_run.add_argument("--api-latency-ms", type=float, default=30.0)
+    p_run.add_argument("--llm-latency-ms", type=float, default=300.0)
+    p_run.add_argument("--scenario", action="append", help="특정 시나리오만 (여러 번 지정 가능)")
+    p_run.add_argument("--port", type=int, default=None)
+    p_run.add_argument("--out", default=None, help="결과 파일 경로 (기본: bench/results/<커밋>-<서버>.json)")
+
+    p_cmp = sub.add_parser("compare", help="두 결과 파일 비교")
+    p_cmp.add_argument("base")
+    p_cmp.add_argument("head")
+    p_cmp.add_argument("--threshold", type=float, default=10.0, help="회귀로 볼 변화율(%%)")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        unknown = set(args.scenario or []) - set(_scenarios({"gu": [""], "facility_ids": [""]}))
+        if unknown:
+            parser.error(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+        return run(args)
+    return compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
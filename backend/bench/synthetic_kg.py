@@ -0,0 +1,150 @@
+"""
+합성 지식 그래프 생성
+
+백엔드가 실제로 보내는 SPARQL 쿼리가 그대로 동작하도록 GraphDB 와 같은 어휘/URI 구조를 씁니다.
+- 시설: koah:AnimalFacility (https://knowledgemap.kr/koah/def/), 25개 구, 카테고리, 좌표
+- 운영 시간: 시설마다 요일별 별도 노드 (koah:facility → 시설)
+- 펫 이름 통계: koah:PetNameStatistic (http://knowledgemap.kr/koah/def/), .../koah/stat/<구>/<이름>
+- 질병/증상: koah:animal → wd:Q144/Q146, skos:broader → 증상, 설명 문장 (챗봇 컨텍스트용)
+"""
+import random
+
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDF, RDFS, SKOS, XSD
+
+SCHEMA = Namespace("http://schema.org/")
+KOAH = Namespace("https://knowledgemap.kr/koah/def/")        # 시설/검색 쿼리에서 쓰는 접두어
+KOAH_HTTP = Namespace("http://knowledgemap.kr/koah/def/")    # sparql_client.KnowledgeGraph 접두어
+KOAD = Namespace("http://vocab.datahub.kr/def/administrative-division/")
+
+GU_URIS = {
+    "용산구": "Q50429", "강서구": "Q50192", "관악구": "Q50353", "금천구": "Q50359", "중랑구": "Q50444",
+    "구로구": "Q50356", "마포구": "Q50388", "양천구": "Q50420", "강남구": "Q20398", "성북구": "Q50412",
+    "강북구": "Q50349", "성동구": "Q50411", "은평구": "Q50432", "서초구": "Q20395", "송파구": "Q50415",
+    "중구": "Q50441", "노원구": "Q50368", "도봉구": "Q50374", "강동구": "Q50348", "서대문구": "Q50408",
+    "광진구": "Q50355", "영등포구": "Q50190", "종로구": "Q36929", "동작구": "Q50385", "동대문구": "Q50382",
+}
+
+# 카테고리 → 이름에 붙는 업종 단어 (검색 케이스 4 의 CONTAINS 매칭용)
+CATEGORIES = {
+    "AnimalHospital": "동물병원",
+    "Cafe": "애견카페",
+    "BeautySalon": "애견미용실",
+    "Hotel": "펫호텔",
+    "Shop": "펫샵",
+    "Pharmacy": "동물약국",
+    "DogPark": "반려견공원",
+    "Playground": "애견놀이터",
+    "FuneralServicesIndustry": "반려동물장례식장",
+    "KoreanRestaurant": "애견동반식당",
+}
+NAME_PREFIXES = ["행복한", "우리", "튼튼", "사랑", "해피", "멍냥", "바른", "24시", "하늘", "초록"]
+ROADS = ["테헤란로", "도산대로", "올림픽로", "강남대로", "왕십리로", "마포대로", "동일로", "시흥대로"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+PET_NAMES = ["코코", "보리", "두부", "콩이", "초코", "몽이", "루이", "별이", "해피", "사랑",
+             "구름", "밤이", "호두", "달이", "망고", "쿠키", "모카", "라떼", "탄이", "뽀미"]
+SYMPTOMS = ["구토", "설사", "기침", "발열", "식욕부진", "탈모", "가려움", "절뚝거림", "재채기", "무기력"]
+DOG = URIRef("http://www.wikidata.org/entity/Q144")
+CAT = URIRef("http://www.wikidata.org/entity/Q146")
+
+
+def build_graph(facilities=2000, diseases=300, seed=42, missing_coords_ratio=0.05):
+    """합성 그래프와 요약 정보(dict)를 반환합니다. 같은 seed 면 항상 같은 그래프."""
+    rng = random.Random(seed)
+    g = Graph()
+    g.bind("schema", SCHEMA)
+    g.bind("koah", KOAH)
+    g.bind("koad", KOAD)
+
+    gu_names = list(GU_URIS)
+    # 구마다 대략적인 중심 좌표 (서울 범위 안에서 고정 배치)
+    centers = {gu: (37.47 + 0.2 * rng.random(), 126.85 + 0.3 * rng.random()) for gu in gu_names}
+
+    facility_ids = []
+    for i in range(facilities):
+        gu = gu_names[i % len(gu_names)]
+        category = rng.choice(list(CATEGORIES))
+        f = URIRef(f"https://knowledgemap.kr/koah/facility/{i}")
+        facility_ids.append(str(f))
+
+        name = f"{rng.choice(NAME_PREFIXES)} {CATEGORIES[category]} {i}호점"
+        lat, lng = centers[gu]
+        g.add((f, RDF.type, KOAH.AnimalFacility))
+        g.add((f, RDFS.label, Literal(name)))
+        g.add((f, SCHEMA.streetAddress, Literal(f"서울특별시 {gu} {rng.choice(ROADS)} {rng.randint(1, 500)}")))
+        g.add((f, SCHEMA.telephone, Literal(f"02-{rng.randint(100, 999)}-{rng.randint(1000, 9999)}")))
+        g.add((f, SCHEMA.description, Literal(f"{gu}에 있는 {CATEGORIES[category]}입니다.")))
+        g.add((f, KOAD.Gu, URIRef(f"http://www.wikidata.org/entity/{GU_URIS[gu]}")))
+        g.add((f, KOAH.category, KOAH[category]))
+        if rng.random() >= missing_coords_ratio:
+            g.add((f, SCHEMA.latitude, Literal(round(lat + rng.uniform(-0.02, 0.02), 6), datatype=XSD.double)))
+            g.add((f, SCHEMA.longitude, Literal(round(lng + rng.uniform(-0.02, 0.02), 6), datatype=XSD.double)))
+
+        # 운영 시간: 24시 병원은 자정 넘김, 나머지는 주간 + 일부 휴무
+        night = category == "AnimalHospital" and rng.random() < 0.2
+        for d, day in enumerate(DAYS):
+            if not night and d == 6 and rng.random() < 0.5:
+                continue
+            h = URIRef(f"https://knowledgemap.kr/koah/hours/{i}/{d}")
+            g.add((h, KOAH.facility, f))
+            g.add((h, SCHEMA.dayOfWeek, SCHEMA[day]))
+            opens, closes = ("20:00:00", "08:00:00") if night else (f"{rng.choice([9, 10])}:00:00", f"{rng.choice([18, 19, 21])}:00:00")
+            g.add((h, SCHEMA.opens, Literal(opens.zfill(8))))
+            g.add((h, SCHEMA.closes, Literal(closes.zfill(8))))
+
+    # 펫 이름 통계
+    for gu in gu_names:
+        for name in PET_NAMES:
+            s = URIRef(f"http://knowledgemap.kr/koah/stat/{gu}/{name}")
+            g.add((s, RDF.type, KOAH_HTTP.PetNameStatistic))
+            g.add((s, RDFS.label, Literal(name)))
+            g.add((s, RDF.value, Literal(rng.randint(5, 500))))
+
+    # 증상(A) / 질병(B) / 메타 태그(C)
+    symptom_uris = []
+    for j, symptom in enumerate(SYMPTOMS):
+        s = URIRef(f"http://knowledgemap.kr/medical/condition/{j}")
+        g.add((s, RDFS.label, Literal(symptom)))
+        symptom_uris.append((s, symptom))
+    for k in range(diseases):
+        d = URIRef(f"http://knowledgemap.kr/koah/disease/{k}")
+        symptom_uri, symptom = rng.choice(symptom_uris)
+        other = rng.choice(SYMPTOMS)
+        g.add((d, KOAH_HTTP.animal, DOG if k % 2 == 0 else CAT))
+        g.add((d, RDFS.label, Literal(f"질병{k}")))
+        g.add((d, SKOS.broader, symptom_uri))
+        g.add((d, SCHEMA.description, Literal(
+            f"질병{k}은(는) 주로 {symptom} 증상을 보이며 {other}이(가) 함께 나타날 수 있습니다. "
+            f"증상이 계속되면 동물병원에 방문하세요.")))
+        tag = URIRef(f"http://knowledgemap.kr/koah/{k}")
+        g.add((tag, SCHEMA.keywords, Literal(f"{symptom}, {other}, 질병{k}")))
+
+    summary = {
+        "facilities": facilities,
+        "diseases": diseases,
+        "triples": len(g),
+        "gu": gu_names,
+        "facility_ids": facility_ids,
+        "seed": seed,
+    }
+    return g, summary
+
+
+def fake_pet_rows(count, seed=7):
+    """서울시 vPetInfo 형식의 가짜 동물 목록"""
+    rng = random.Random(seed)
+    kinds = [("[개]", "믹스견"), ("[개]", "말티즈"), ("[개]", "골든 리트리버"), ("[고양이]", "코리안 숏헤어"),
+             ("[고양이]", "페르시안"), ("DOG", "Poodle"), ("CAT", ""), ("[기타축종]", "토끼")]
+    rows = []
+    for i in range(count):
+        animal_type, breed = rng.choice(kinds)
+        rows.append({
+            "ANIMAL_NO": str(100000 + i),
+            "NM": rng.choice(PET_NAMES),
+            "ANIMAL_TYPE": animal_type,
+            "ANIMAL_BREED": breed,
+            "AGE": f"{rng.randint(0, 15)}살",
+            "SEXDSTN": rng.choice(["M", "F"]),
+        })
+    return rows
@@ -0,0 +1,175 @@
+"""
+챗봇 프롬프트 컨텍스트 구성
+
+GraphDB 검색 결과(후보 문단)를 그대로 이어 붙이지 않고
+1. 출처(A/B/C 파일)·키워드 빈도·길이로 순위를 매기고
+2. 내용이 거의 같은 문단(글자 3-gram 자카드 유사도)을 제거한 뒤
+3. 토큰 예산 안에서 위에서부터 채웁니다.
+각 문단에는 출처 표시를 남겨 답변 마지막에 참조한 데이터베이스를 말할 수 있게 합니다.
+
+고정 지시문(SYSTEM_INSTRUCTION)은 매 요청 본문에 넣지 않고 모델의 system instruction 으로 한 번만 설정합니다.
+"""
+import math
+import os
+import re
+import threading
+from collections import namedtuple
+
+SYSTEM_INSTRUCTION = """너는 유기동물 보호 및 입양 플랫폼 '애니멀루(Animalloo)'의 친절한 AI 챗봇이야.
+
+[지시사항]
+1. 사용자 메시지에 함께 제공된 [수의학 데이터베이스 정보]를 바탕으로 답변해.
+2. 너의 환각 증세를 0%로 만들어야해 절대 너는 [수의학 데이터베이스 정보] 외 다른 곳에서 정보를 가져오면 안돼.
+3. 만약 [수의학 데이터베이스 정보]에서 정보가 없으면 임의로 답변하지말고 솔직하게 데이터가 없다고 답변해.
+4. 친근한 말투(해요체)와 이모지를 사용해.
+5. 대답은 6줄 이내로 핵심만 요약해서 적어줘.
+6. 의학적 진단은 피하고, 병원 방문을 권유해.
+7. 마지막에 너가 [수의학 데이터베이스 정보]에서 어떤 데이터 베이스를 참조해왔는지 꼭 말해줘 (각 줄 앞의 [A]/[B]/[C] 출처 표시 참고)"""
+
+# 출처 구분 (URI 패턴) 과 순위 가중치
+SOURCES = {
+    "A": "File_A (증상 목록)",
+    "B": "File_B (질병 백과)",
+    "C": "File_C (메타 데이터)",
+}
+SOURCE_WEIGHT = {"B": 3.0, "A": 2.0, "C": 1.0}
+
+# 사용자 메시지에서 찾는 증상 키워드 (앞쪽이 우선)
+SYMPTOM_KEYWORDS = ("구토", "설사", "기침")
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CHAT_CONTEXT_TOKEN_BUDGET", "800"))
+NEAR_DUPLICATE_THRESHOLD = 0.8
+MAX_PASSAGE_CHARS = 400
+
+Passage = namedtuple("Passage", ["source", "uri", "text", "score", "tokens"])
+
+
+def source_of(uri):
+    """URI 패턴으로 출처(A/B/C) 판별, 해당 없으면 None"""
+    if "/medical/condition/" in uri:
+        return "A"
+    if "/koah/disease/" in uri:
+        return "B"
+    if "/koah/" in uri:  # disease 없이 숫자만 있는 경우
+        return "C"
+    return None
+
+
+def estimate_tokens(text):
+    """토큰 수 추정 (오프라인): 한글 등 비 ASCII 는 글자당 1, ASCII 는 4글자당 1"""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + math.ceil((len(text) - non_ascii) / 4)
+
+
+def _clean(text):
+    text = text.replace("\n", " ").replace("#", "")
+    text = re.sub(r"\s+", " ", text).strip()
+    if len(text) > MAX_PASSAGE_CHARS:
+        text = text[:MAX_PASSAGE_CHARS].rstrip() + "…"
+    return text
+
+
+def _shingles(text, n=3):
+    compact = re.sub(r"\s+", "", text.lower())
+    if len(compact) <= n:
+        return {compact}
+    return {compact[i:i + n] for i in range(len(compact) - n + 1)}
+
+
+def _similarity(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def rank_passages(bindings, keyword):
+    """SPARQL 결과(?s ?o) → 점수순 Passage 목록 (같은 문장은 하나만)"""
+    candidates = {}
+    for r in bindings:
+        # 오타 수정
+        uri = r["s"]["value"].replace("knowlefgemap", "knowledgemap")
+        text = _clean(r["o"]["value"])
+        if not text:
+            continue
+        source = source_of(uri)
+
+        # 키워드가 많이, 앞쪽에 나오고, 너무 짧거나 길지 않은 문단 우선
+        hits = text.count(keyword)
+        position = text.find(keyword)
+        score = SOURCE_WEIGHT.get(source, 0.5) + hits
+        if position >= 0:
+            score += 1.0 / (1 + position / 50)
+        if len(text) < 10:
+            score -= 1.0
+
+        previous = candidates.get(text)
+        if previous is None or score > previous.score:
+            candidates[text] = Passage(source, uri, text, score, estimate_tokens(text))
+
+    return sorted(candidates.values(), key=lambda p: p.score, reverse=True)
+
+
+def select_passages(passages, budget=CONTEXT_TOKEN_BUDGET):
+    """근사 중복을 제거하며 토큰 예산 안에서 상위 문단을 고릅니다."""
+    selected, selected_shingles = [], []
+    used = 0
+    for passage in passages:
+        # 출처 표시 "- [B] " 와 줄바꿈 몫
+        cost = passage.tokens + 4
+        if used + cost > budget:
+            continue
+        shingles = _shingles(passage.text)
+        if any(_similarity(shingles, s) >= NEAR_DUPLICATE_THRESHOLD for s in selected_shingles):
+            continue
+        selected.append(passage)
+        selected_shingles.append(shingles)
+        used += cost
+    return selected, used
+
+
+def format_context(passages):
+    return "\n".join(f"- [{p.source or '기타'}] {p.text}" for p in passages)
+
+
+def build_user_prompt(user_message, context):
+    """요청마다 바뀌는 부분만 담은 사용자 메시지 (고정 지시문은 system instruction)"""
+    if not context:
+        return f"[수의학 데이터베이스 정보]\n(관련 데이터 없음)\n\n사용자 질문: {user_message}"
+    legend = ", ".join(f"[{key}] {name}" for key, name in SOURCES.items())
+    return (f"[수의학 데이터베이스 정보] (출처: {legend})\n{context}\n\n"
+            f"사용자 질문: {user_message}")
+
+
+class PromptTokenStats:
+    """요청당 프롬프트 토큰 수 집계 (Gemini usage_metadata 기준, 없으면 추정치)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.total = 0
+        self.max = 0
+        self.last = 0
+        self.context_total = 0
+
+    def record(self, prompt_tokens, context_tokens):
+        with self._lock:
+            self.requests += 1
+            self.total += prompt_tokens
+            self.max = max(self.max, prompt_tokens)
+            self.last = prompt_tokens
+            self.context_total += context_tokens
+
+    def snapshot(self):
+        with self._lock:
+            avg = self.total / self.requests if self.requests else 0
+            ctx_avg = self.context_total / self.requests if self.requests else 0
+            return {
+                "requests": self.requests,
+                "prompt_tokens_avg": round(avg, 1),
+                "prompt_tokens_max": self.max,
+                "prompt_tokens_last": self.last,
+                "context_tokens_avg": round(ctx_avg, 1),
+            }
+
+
+prompt_token_stats = PromptTokenStats()
@@ -0,0 +1,261 @@
+"""
+시설 데이터 버전 관리 + 변경분(delta) 동기화
+
+refresh 명령이 GraphDB 에서 시설 전체를 읽어 이전 세대와 비교(diff)하고,
+새 세대 번호와 추가/수정/삭제된 시설 ID 를 변경 이력 파일에 기록합니다.
+클라이언트는 마지막으로 받은 버전을 since 로 보내 바뀐 시설만 받습니다.
+
+    python facility_sync.py refresh     # (cron 등으로 주기 실행)
+
+GET /api/facilities/changes?since=<version>
+    - since 가 없거나 이력 범위를 벗어나면 전체 목록(full=true)
+    - 그 외에는 since 이후 순(net) 변경분만: added / updated (레코드), deleted (ID)
+    - 아직 refresh 한 적이 없으면 404 (클라이언트는 /api/facilities 로 대체)
+
+워커는 변경 이력 파일을 주기적으로 다시 읽고 새 세대가 있으면 data_generation 을 올립니다.
+/api/facilities 도 요청마다 이를 확인하고, 변경 이력이 스냅샷보다 새로우면 변경 이력의 시설 목록을
+내보내므로 두 엔드포인트가 같은 세대의 데이터를 돌려줍니다.
+(운영 시간(open_at) 필터는 스냅샷 기준이므로 refresh 후 snapshot.py build 도 함께 실행하세요.)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from flask import Blueprint, jsonify, request
+
+from http_cache import cached_json, data_generation
+
+CHANGELOG_PATH = os.getenv(
+    "FACILITY_CHANGELOG_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "facility_changelog.json"),
+)
+MAX_HISTORY = 100        # 보관할 세대 수 (이보다 오래된 since 는 전체 재동기화)
+RELOAD_INTERVAL = 30     # 워커가 변경 이력 파일 갱신 여부를 확인하는 간격(초)
+
+FIELDS = ["id", "name", "address", "tel", "lat", "lng", "desc", "category", "gu"]
+
+facility_sync_bp = Blueprint("facility_sync", __name__)
+
+
+def _fingerprint(record):
+    raw = json.dumps(record, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+
+# ============================================================
+# 세대 생성 (오프라인)
+# ============================================================
+
+def load_current_facilities():
+    """GraphDB 에서 서울 전체 시설을 {id: 레코드} 로 읽어옵니다.
+    카테고리가 여러 개면 categories 에 모두 담고 category 는 첫 번째 (/api/facilities 와 같은 값)"""
+    from snapshot import export_facilities
+
+    facilities = {}
+    for row in export_facilities():
+        record = dict(zip(FIELDS, row))
+        existing = facilities.get(record["id"])
+        if existing is None:
+            record["categories"] = [record["category"]]
+            facilities[record["id"]] = record
+        elif record["category"] not in existing["categories"]:
+            existing["categories"].append(record["category"])
+    return facilities
+
+
+def diff(old, new):
+    """이전/현재 {id: 레코드} → (added, updated, deleted) ID 목록"""
+    old_fp = {fid: _fingerprint(r) for fid, r in old.items()}
+    added, updated = [], []
+    for fid, record in new.items():
+        if fid not in old_fp:
+            added.append(fid)
+        elif old_fp[fid] != _fingerprint(record):
+            updated.append(fid)
+    deleted = [fid for fid in old if fid not in new]
+    return sorted(added), sorted(updated), sorted(deleted)
+
+
+def _min_version(changelog):
+    """변경분을 계산할 수 있는 가장 오래된 since.
+    기록이 없으면(첫 세대, 또는 min_version=0 으로 만들어진 이전 파일) 첫 세대 자신:
+    이력 파일을 새로 만들었다면 그 전 since 로는 삭제된 시설을 알 수 없으므로 전체 재동기화"""
+    if changelog.get("min_version"):
+        return changelog["min_version"]
+    history = changelog["history"]
+    return history[0]["version"] if history else changelog["version"]
+
+
+def read_changelog(path=CHANGELOG_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def refresh(path=CHANGELOG_PATH):
+    """새 세대를 만들고 변경 이력을 갱신합니다. 변경이 없으면 세대를 올리지 않습니다."""
+    changelog = read_changelog(path) or {"version": 0, "history": [], "facilities": {}}
+    current = load_current_facilities()
+    added, updated, deleted = diff(changelog["facilities"], current)
+
+    if not (added or updated or deleted):
+        print(f"🔄 [시설 동기화] 변경 없음 (version={changelog['version']})")
+        return changelog
+
+    # 세대 번호는 시각 기반(스냅샷과 같은 방식)이라 여러 워커/서버에서 비교 가능
+    version = max(int(time.time()), changelog["version"] + 1)
+    history = changelog["history"] + [{
+        "version": version,
+        "added": added,
+        "updated": updated,
+        "deleted": deleted,
+    }]
+    dropped, history = history[:-MAX_HISTORY], history[-MAX_HISTORY:]
+    # 이 버전 이상이면 남은 이력으로 변경분 계산 가능 (그보다 오래되면 전체 재동기화)
+    min_version = dropped[-1]["version"] if dropped else _min_version({**changelog, "history": history})
+
+    changelog = {
+        "version": version,
+        "built_at": time.time(),
+        "min_version": min_version,
+        "history": history,
+        "facilities": current,
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(changelog, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+    print(f"🔄 [시설 동기화] version={version}: 추가 {len(added)}, 수정 {len(updated)}, 삭제 {len(deleted)} "
+          f"(전체 {len(current)}곳)")
+    return changelog
+
+
+# ============================================================
+# 변경분 계산 (워커)
+# ============================================================
+
+_lock = threading.Lock()
+_state = {"changelog": None, "mtime": None, "checked_at": 0.0}
+
+
+def get_changelog():
+    """변경 이력 파일을 읽어 둡니다. RELOAD_INTERVAL 마다 파일이 바뀌었는지 확인합니다."""
+    now = time.time()
+    if now - _state["checked_at"] < RELOAD_INTERVAL:
+        return _state["changelog"]
+
+    with _lock:
+        _state["checked_at"] = now
+        try:
+            mtime = os.path.getmtime(CHANGELOG_PATH)
+        except OSError:
+            return _state["changelog"]
+        if mtime != _state["mtime"]:
+            changelog = read_changelog()
+            _state["changelog"], _state["mtime"] = changelog, mtime
+            # 새 세대가 들어오면 HTTP 캐시(ETag)도 함께 무효화
+            if changelog and changelog["version"] > data_generation.version:
+                data_generation.set(changelog["version"], changelog.get("built_at"))
+    return _state["changelog"]
+
+
+def changelog_facilities(changelog, gu=None, category=None):
+    """변경 이력에 저장된 최신 세대의 시설 목록 (/api/facilities 형식, gu 가 None 이면 서울 전체)
+    category 로 거르면 GraphDB 조회처럼 그 카테고리를 category 값으로 돌려줍니다."""
+    facilities = []
+    for record in changelog["facilities"].values():
+        if gu is not None and record["gu"] != gu:
+            continue
+        # categories 가 없는 이전 형식의 이력 파일은 category 하나만 있음
+        categories = record.get("categories") or [record["category"]]
+        if category and category not in categories:
+            continue
+        facility = {key: val for key, val in record.items() if key not in ("gu", "categories")}
+        if category:
+            facility["category"] = category
+        facilities.append(facility)
+    return facilities
+
+
+def normalize_since(changelog, since):
+    """since 와 같은 변경분을 주는 이력상의 버전. 이력으로 계산할 수 없으면 None (전체 재동기화)
+    이력 버전 사이의 값은 바로 앞 버전과 결과가 같으므로 하나로 모아 캐시 키가 늘어나지 않게 합니다."""
+    min_version = _min_version(changelog)
+    if since is None or since > changelog["version"] or since < min_version:
+        return None
+    versions = [min_version] + [entry["version"] for entry in changelog["history"]]
+    return max(v for v in versions if v <= since)
+
+
+def changes_since(changelog, since):
+    """since 이후의 순 변경분. 이력으로 계산할 수 없으면 None (전체 재동기화 필요)"""
+    since = normalize_since(changelog, since)
+    if since is None:
+        return None
+
+    # 시설별 첫 이벤트만 기억: since 시점에 있었는지(added 가 아니면 있었음)를 판단
+    first_event = {}
+    for entry in changelog["history"]:
+        if entry["version"] <= since:
+            continue
+        for kind in ("added", "updated", "deleted"):
+            for fid in entry[kind]:
+                first_event.setdefault(fid, kind)
+
+    facilities = changelog["facilities"]
+    added, updated, deleted = [], [], []
+    for fid, first in sorted(first_event.items()):
+        existed_before = first != "added"
+        if fid in facilities:
+            (updated if existed_before else added).append(facilities[fid])
+        elif existed_before:
+            deleted.append(fid)
+    return {"added": added, "updated": updated, "deleted": deleted}
+
+
+@facility_sync_bp.route("/api/facilities/changes")
+def get_facility_changes():
+    since = request.args.get("since")
+    if since is not None:
+        try:
+            since = int(since)
+        except ValueError:
+            return jsonify({"error": "since 는 정수 버전이어야 합니다."}), 400
+
+    changelog = get_changelog()
+    if changelog is None:
+        return jsonify({"error": "시설 변경 이력이 아직 없습니다. (python facility_sync.py refresh)"}), 404
+
+    # 클라이언트가 보낸 값을 그대로 키로 쓰면 임의의 since 로 공용 캐시의 다른 항목이 밀려나므로
+    # 전체 재동기화는 "full" 하나로, 나머지는 이력상의 버전으로 모음
+    since = normalize_since(changelog, since)
+
+    def build():
+        if since is None:
+            return {"version": changelog["version"], "full": True,
+                    "facilities": list(changelog["facilities"].values())}
+        return {"version": changelog["version"], "full": False, "since": since,
+                **changes_since(changelog, since)}
+
+    try:
+        # 스냅샷 세대와 별개로 바뀔 수 있으므로 변경 이력 버전도 키에 포함
+        key = (changelog["version"], "full" if since is None else since)
+        return cached_json("facility-changes", key, build)
+    except Exception as e:
+        print(f"[ERROR] 시설 변경분 조회 실패: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="시설 데이터 세대 갱신")
+    parser.add_argument("command", choices=["refresh"])
+    parser.parse_args()
+    refresh()
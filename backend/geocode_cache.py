@@ -0,0 +1,177 @@
+"""
+주소 → 좌표 지오코딩 캐시 (오프라인 빌드, 로컬 SQLite)
+
+GraphDB 에 schema:latitude / schema:longitude 가 없는 시설은 주소만 있으므로,
+예전에는 프론트엔드가 검색 결과마다 카카오 Geocoder 를 호출해야 했습니다.
+이 캐시는 그런 주소를 한 번만 카카오 로컬 API 로 변환해 저장해 두고,
+/api/search 가 결과에 좌표를 바로 붙일 수 있게 합니다.
+
+빌드 (KAKAO_REST_API_KEY 필요):
+    python geocode_cache.py build            # 아직 캐시에 없는 주소만 변환
+    python geocode_cache.py build --retry    # 이전에 실패한 주소도 다시 시도
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+GRAPHDB_ENDPOINT = os.getenv("GRAPHDB_URL", "http://localhost:7200/repositories/knowledgemap")
+GEOCODE_DB_PATH = os.getenv(
+    "GEOCODE_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "geocode_cache.sqlite"),
+)
+KAKAO_ADDRESS_URL = "https://dapi.kakao.com/v2/local/search/address.json"
+REQUEST_INTERVAL = 0.05  # 카카오 API 호출 간격(초)
+
+_lock = threading.Lock()
+_table = None
+
+
+def _connect(path=GEOCODE_DB_PATH):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS geocode (
+            address    TEXT PRIMARY KEY,
+            lat        REAL,
+            lng        REAL,
+            updated_at REAL NOT NULL
+        )
+    """)
+    return conn
+
+
+def normalize_address(address):
+    return " ".join(address.split()) if address else ""
+
+
+# ============================================================
+# 조회 (워커)
+# ============================================================
+
+def _load_table():
+    """캐시 테이블 전체를 dict 로 읽어 둡니다. (수천 건 수준이라 메모리 부담 없음)"""
+    global _table
+    if _table is None:
+        with _lock:
+            if _table is None:
+                table = {}
+                if os.path.exists(GEOCODE_DB_PATH):
+                    conn = sqlite3.connect(f"file:{GEOCODE_DB_PATH}?mode=ro", uri=True)
+                    try:
+                        for address, lat, lng in conn.execute(
+                                "SELECT address, lat, lng FROM geocode WHERE lat IS NOT NULL"):
+                            table[address] = (lat, lng)
+                    finally:
+                        conn.close()
+                _table = table
+    return _table
+
+
+def lookup(address):
+    """주소 → (lat, lng). 캐시에 없으면 None"""
+    if not address:
+        return None
+    return _load_table().get(normalize_address(address))
+
+
+# ============================================================
+# 빌드 (오프라인)
+# ============================================================
+
+def addresses_without_coordinates():
+    """GraphDB 에서 좌표 없이 주소만 있는 시설 주소 목록"""
+    import requests
+
+    query = """
+    PREFIX koah: <https://knowledgemap.kr/koah/def/>
+    PREFIX schema: <http://schema.org/>
+
+    SELECT DISTINCT ?address WHERE {
+        ?facility a koah:AnimalFacility ;
+                  schema:streetAddress ?address .
+        FILTER NOT EXISTS { ?facility schema:latitude ?lat . }
+    }
+    """
+    res = requests.get(
+        GRAPHDB_ENDPOINT,
+        params={"query": query},
+        headers={"Accept": "application/sparql-results+json"},
+    )
+    res.raise_for_status()
+    return [b["address"]["value"] for b in res.json()["results"]["bindings"]]
+
+
+def geocode(session, address, api_key):
+    """카카오 로컬 API 로 주소 → (lat, lng). 결과가 없으면 None"""
+    res = session.get(
+        KAKAO_ADDRESS_URL,
+        params={"query": address},
+        headers={"Authorization": f"KakaoAK {api_key}"},
+        timeout=10,
+    )
+    res.raise_for_status()
+    documents = res.json().get("documents", [])
+    if not documents:
+        return None
+    return float(documents[0]["y"]), float(documents[0]["x"])
+
+
+def build(retry_failed=False, path=GEOCODE_DB_PATH):
+    import requests
+
+    api_key = os.getenv("KAKAO_REST_API_KEY")
+    if not api_key:
+        raise SystemExit("KAKAO_REST_API_KEY 환경 변수가 필요합니다.")
+
+    conn = _connect(path)
+    if retry_failed:
+        done = {row[0] for row in conn.execute("SELECT address FROM geocode WHERE lat IS NOT NULL")}
+    else:
+        done = {row[0] for row in conn.execute("SELECT address FROM geocode")}
+
+    pending = sorted({normalize_address(a) for a in addresses_without_coordinates()} - done - {""})
+    print(f"🗺️ [지오코딩] 변환 대상 {len(pending)}건 (캐시 {len(done)}건)")
+
+    session = requests.Session()
+    ok = failed = 0
+    for address in pending:
+        try:
+            coords = geocode(session, address, api_key)
+        except requests.RequestException as e:
+            # 네트워크 오류는 기록하지 않고 다음 빌드에서 재시도
+            print(f"   ⚠️ {address}: {e}")
+            continue
+
+        # 결과 없음도 저장해 두어 매번 다시 호출하지 않음 (lat/lng = NULL)
+        lat, lng = coords if coords else (None, None)
+        conn.execute(
+            "INSERT OR REPLACE INTO geocode (address, lat, lng, updated_at) VALUES (?, ?, ?, ?)",
+            (address, lat, lng, time.time()),
+        )
+        if coords:
+            ok += 1
+        else:
+            failed += 1
+        if (ok + failed) % 100 == 0:
+            conn.commit()
+        time.sleep(REQUEST_INTERVAL)
+
+    conn.commit()
+    conn.close()
+    print(f"✅ [지오코딩] 성공 {ok}건, 결과 없음 {failed}건 → {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="주소 지오코딩 캐시 빌드")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="좌표 없는 시설 주소를 지오코딩해 캐시에 저장")
+    p_build.add_argument("--retry", action="store_true", help="이전에 결과가 없던 주소도 다시 시도")
+    p_build.add_argument("--db", default=GEOCODE_DB_PATH)
+    args = parser.parse_args(argv)
+    build(retry_failed=args.retry, path=args.db)
+
+
+if __name__ == "__main__":
+    main()
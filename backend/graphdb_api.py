@@ -1,9 +1,15 @@
+import os
+
 from flask import Blueprint, request, jsonify
-import requests
+from services import get_http_session
+from http_cache import PAYLOAD_MAX_AGE, cached_json, data_cache
+from opening_hours import get_hours_index, parse_open_at
+from snapshot import get_snapshot
+from facility_sync import changelog_facilities, get_changelog
 
 graphdb_bp = Blueprint("graphdb", __name__)
 
-GRAPHDB_ENDPOINT = "http://localhost:7200/repositories/knowledgemap"
+GRAPHDB_ENDPOINT = os.getenv("GRAPHDB_URL", "http://localhost:7200/repositories/knowledgemap")
 
 gu_map = {
     "용산구": "http://www.wikidata.org/entity/Q50429",
@@ -37,12 +43,87 @@ gu_map = {
 
 @graphdb_bp.route("/api/facilities")
 def get_facilities():
+    """
+    구(gu) 또는 지도 영역(bbox=minLat,minLng,maxLat,maxLng)의 시설 목록
+    - category=Cafe 처럼 koah 카테고리로 필터
+    - open_at=now 또는 ISO 8601 시각(예: 2025-01-01T23:30)이면 그 시각에 영업 중인 곳만
+    """
     gu = request.args.get("gu")
+    category = request.args.get("category")
+    bbox_param = request.args.get("bbox")
+    open_at_param = request.args.get("open_at")
 
-    if not gu or gu not in gu_map:
+    bbox = None
+    if bbox_param:
+        try:
+            bbox = parse_bbox(bbox_param)
+        except ValueError:
+            return jsonify({"error": "bbox 형식: minLat,minLng,maxLat,maxLng"}), 400
+        if gu and gu not in gu_map:
+            return jsonify([]), 200
+    elif not gu or gu not in gu_map:
         return jsonify([]), 200
 
-    gu_uri = gu_map[gu]
+    when = None
+    if open_at_param is not None:
+        try:
+            when = parse_open_at(open_at_param)
+        except ValueError:
+            return jsonify({"error": "open_at 형식: now 또는 ISO 8601 (예: 2025-01-01T23:30)"}), 400
+
+    try:
+        # 다른 워커에서 반영된 새 세대(변경 이력)를 캐시 조회 전에 이 워커에도 반영 → 워커 간 ETag 일치
+        get_changelog()
+
+        if bbox is None and when is None:
+            # 구/카테고리별로 직렬화·압축된 응답을 재사용 (ETag 304 지원)
+            return cached_json("facilities", (gu, category),
+                               lambda: _facilities_source(gu, category))
+
+        # 구(없으면 서울 전체) 목록은 직렬화/압축 없이 캐시해 두고, 영역/영업시간만 추가로 거릅니다.
+        facilities = data_cache.get_or_build(
+            ("facilities", gu or None, category),
+            lambda: _facilities_source(gu or None, category),
+            PAYLOAD_MAX_AGE["facilities"],
+        ).data
+        if bbox is not None:
+            min_lat, min_lng, max_lat, max_lng = bbox
+            facilities = [f for f in facilities
+                          if min_lat <= f["lat"] <= max_lat and min_lng <= f["lng"] <= max_lng]
+        if when is not None:
+            facilities = get_hours_index().filter_open(facilities, when)
+
+        response = jsonify(facilities)
+        # 시각에 따라 결과가 바뀌므로 짧게만 캐시
+        response.headers["Cache-Control"] = "public, max-age=60"
+        return response
+    except Exception as e:
+        print(f"[ERROR] 시설 목록 조회 실패: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+def parse_bbox(value):
+    min_lat, min_lng, max_lat, max_lng = (float(v) for v in value.split(","))
+    if min_lat > max_lat or min_lng > max_lng:
+        raise ValueError(value)
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def _facilities_source(gu, category=None):
+    # refresh 로 만든 변경 이력이 스냅샷보다 새로우면 변경 이력의 목록 (/api/facilities/changes 와 같은 데이터)
+    changelog = get_changelog()
+    snap = get_snapshot()
+    if changelog is not None and (snap is None or changelog["version"] > snap.generation):
+        return changelog_facilities(changelog, gu, category)
+    # 스냅샷이 있으면 mmap 에서 바로 읽고, 없으면 GraphDB 조회
+    if snap is not None:
+        return snap.facilities_in_gu(gu, category)
+    return load_facilities(gu, category)
+
+
+def load_facilities(gu, category=None):
+    """GraphDB 에서 구의 시설 목록을 조회합니다. (gu 가 None 이면 서울 전체, category 는 koah 카테고리 이름, 예: Cafe)"""
+    gu_clause = f"koad:Gu <{gu_map[gu]}> ." if gu else "koad:Gu ?gu ."
 
     query = f"""
     PREFIX schema: <http://schema.org/>
@@ -50,7 +131,7 @@ def get_facilities():
     PREFIX koah: <https://knowledgemap.kr/koah/def/>
     PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
 
-    SELECT ?facility ?name ?address ?tel ?lat ?long ?desc
+    SELECT ?facility ?name ?address ?tel ?lat ?long ?desc ?category
     WHERE {{
         ?facility a koah:AnimalFacility ;
                   rdfs:label ?name ;
@@ -59,31 +140,46 @@ def get_facilities():
                   schema:latitude ?lat ;
                   schema:longitude ?long ;
                   schema:description ?desc ;
-                  koad:Gu <{gu_uri}> .
+                  {gu_clause}
+        OPTIONAL {{ ?facility koah:category ?category . }}
     }}
     """
 
-    res = requests.get(
+    res = get_http_session().get(
         GRAPHDB_ENDPOINT,
         params={"query": query},
         headers={"Accept": "application/sparql-results+json"}
     )
+    res.raise_for_status()
 
     data = res.json()
 
     bindings = data["results"]["bindings"]
 
-    facilities = [
-        {
-            "id": row["facility"]["value"],
+    facilities = []
+    seen = set()
+    for row in bindings:
+        facility_id = row["facility"]["value"]
+        # 카테고리 URI 는 뒷부분만 사용 (예: https://.../koah/def/Cafe -> Cafe)
+        row_category = row.get("category", {}).get("value", "")
+        row_category = row_category.split("/")[-1].split("#")[-1]
+
+        if category and row_category != category:
+            continue
+        # 카테고리가 여러 개인 시설은 한 번만 포함
+        if facility_id in seen:
+            continue
+        seen.add(facility_id)
+
+        facilities.append({
+            "id": facility_id,
             "name": row["name"]["value"],
             "address": row["address"]["value"],
             "tel": row["tel"]["value"],
             "lat": float(row["lat"]["value"]),
             "lng": float(row["long"]["value"]),
             "desc": row["desc"]["value"],
-        }
-        for row in bindings
-    ]
+            "category": row_category,
+        })
 
-    return jsonify(facilities)
+    return facilities
@@ -0,0 +1,75 @@
+"""
+운영 서버 설정 (gunicorn)
+
+실행:
+    cd backend
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+환경 변수로 조정:
+    GUNICORN_BIND     기본 0.0.0.0:5001
+    GUNICORN_WORKERS  기본 CPU 코어 수 * 2 + 1
+    GUNICORN_THREADS  워커당 스레드 수, 기본 4 (GraphDB/Gemini 대기 시간이 길어 스레드가 유리)
+    GUNICORN_TIMEOUT  기본 60초 (Gemini 응답 대기 포함)
+
+무중단 재시작 (preload_app=True 이므로 데이터와 코드 갱신 방법이 다름)
+  - 데이터 갱신 (snapshot.py build 후): kill -HUP <master pid>
+    → 새 설정으로 워커를 새로 띄우고, 기존 워커는 처리 중인 요청을 마친 뒤 종료합니다.
+      새 워커는 fork 직후 스냅샷 파일을 다시 엽니다. 앱 코드는 마스터에 preload 된 것을
+      그대로 물려받으므로 HUP 으로는 코드 변경이 반영되지 않습니다.
+  - 코드 배포: kill -USR2 <master pid>
+    → 새 코드로 새 마스터/워커가 뜬 것을 확인한 뒤
+      kill -WINCH <이전 master pid> (이전 워커 종료), kill -QUIT <이전 master pid>
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5001")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+
+# fork 전에 앱을 로드해 모듈/라우트 테이블 등 읽기 전용 데이터를 copy-on-write 로 공유
+# (스냅샷은 워커마다 mmap 하지만 같은 파일이라 페이지 캐시를 공유)
+preload_app = True
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# 메모리 누수 대비: 일정 요청 수마다 워커를 순차 교체 (jitter 로 동시 재시작 방지)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = 1000
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG")  # 예: "-" (stdout)
+errorlog = "-"
+
+# worker_stats 가 스레드 수를 보고할 수 있도록 전달
+os.environ["GUNICORN_THREADS"] = str(threads)
+# admission 이 서버 전체 속도 한도를 워커 수로 나눌 수 있도록 전달 (preload 전에 설정됨)
+os.environ["GUNICORN_WORKERS"] = str(workers)
+
+
+def when_ready(server):
+    server.log.info(f"🚀 Animalloo 백엔드 준비 완료: workers={workers}, threads={threads}, bind={bind}")
+
+
+def post_fork(server, worker):
+    # preload 된 부모의 카운터/스레드 로컬 상태를 물려받지 않도록 워커에서 초기화
+    from worker_stats import worker_stats
+    from admission import admission_controller
+    from snapshot import get_snapshot, reset_snapshot
+    worker_stats.reset()
+    admission_controller.reset()
+    # 스냅샷은 워커에서 열어야 HUP 후 새 워커가 다시 빌드된 파일을 읽음
+    reset_snapshot()
+    get_snapshot()
+    server.log.info(f"워커 시작 pid={worker.pid} (스레드 {threads}개)")
+
+
+def worker_exit(server, worker):
+    from worker_stats import worker_stats
+    stats = worker_stats.snapshot()
+    server.log.info(
+        f"워커 종료 pid={worker.pid}: 누적 {stats['requests_total']}건, "
+        f"최대 동시 처리 {stats['peak_in_flight']}건"
+    )
@@ -0,0 +1,190 @@
+"""
+HTTP 레벨 캐시
+- 데이터 세대(generation) 버전으로 ETag / Last-Modified 생성
+- If-None-Match / If-Modified-Since 조건부 GET → 304 응답
+- 구·카테고리별 JSON 을 미리 직렬화 + 압축(gzip/brotli)해 두고 그대로 전송
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from email.utils import formatdate
+
+from flask import Response, request
+
+try:
+    # 선택 의존성: 설치되어 있으면 br 인코딩도 미리 만들어 둡니다.
+    import brotli
+except ImportError:
+    brotli = None
+
+# 엔드포인트별 Cache-Control 정책
+CACHE_CONTROL = {
+    # 시설 목록: 자주 안 바뀌지만 지도 화면이라 5분마다 재검증
+    "facilities": "public, max-age=300, stale-while-revalidate=3600",
+    # 펫 이름 통계: 거의 안 바뀜
+    "pet-names": "public, max-age=3600, stale-while-revalidate=86400",
+    # 시설 변경분: 클라이언트가 자주 폴링하므로 짧게
+    "facility-changes": "public, max-age=60",
+}
+DEFAULT_CACHE_CONTROL = "no-cache"
+
+# 서버 쪽 페이로드 캐시 최대 보관 시간(초). 스냅샷/변경 이력이 없어 세대 번호가 안 바뀌는 환경에서도
+# 이 시간이 지나면 GraphDB 에서 다시 읽습니다. (재색인 중 받은 빈 목록이 계속 남지 않도록)
+# facility-changes 는 캐시 키에 변경 이력 버전이 들어 있어 내용이 바뀔 수 없으므로 만료하지 않음
+PAYLOAD_MAX_AGE = {
+    "facilities": int(os.getenv("FACILITIES_CACHE_MAX_AGE", "300")),
+    "pet-names": int(os.getenv("PET_NAMES_CACHE_MAX_AGE", "3600")),
+}
+
+# 이보다 작은 응답은 압축 이득이 없으므로 원본 그대로 보냅니다.
+MIN_COMPRESS_SIZE = 512
+# 캐시 미스 때 요청 스레드에서 압축하므로 최고 압축률 대신 속도 위주 레벨 사용
+# (서울 전체 목록 기준 brotli 11 은 수 초, brotli 5 / gzip 6 은 수십 ms 이고 크기는 10~30% 차이)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# 잘못된 구 이름 등으로 키가 무한히 늘어나는 것을 막기 위한 상한
+MAX_ENTRIES = 512
+
+
+class DataGeneration:
+    """GraphDB 데이터 세대 번호. 데이터가 바뀌면 bump() 로 올려 모든 캐시를 무효화합니다."""
+
+    def __init__(self, version=1):
+        self._lock = threading.Lock()
+        self.version = version
+        self.updated_at = time.time()
+
+    def set(self, version, updated_at=None):
+        with self._lock:
+            self.version = version
+            self.updated_at = updated_at or time.time()
+
+    def bump(self):
+        with self._lock:
+            self.version += 1
+            self.updated_at = time.time()
+            return self.version
+
+
+data_generation = DataGeneration(int(os.getenv("DATA_GENERATION", "1")))
+
+
+class CachedPayload:
+    """직렬화/압축이 끝난 응답 본문과 검증자(ETag, Last-Modified)"""
+
+    __slots__ = ("version", "built_at", "modified_at", "body", "gzip_body", "br_body",
+                 "etag", "last_modified")
+
+    def __init__(self, version, updated_at, obj, previous=None):
+        self.version = version
+        self.built_at = time.time()
+        self.body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        digest = hashlib.sha1(self.body).hexdigest()[:16]
+        self.etag = f"g{version}-{digest}"
+        # 같은 세대 안에서 만료 후 다시 만들었는데 내용이 바뀌었으면 수정 시각을 지금으로
+        if previous is not None and previous.version == version and previous.etag != self.etag:
+            updated_at = self.built_at
+        elif previous is not None and previous.version == version:
+            updated_at = previous.modified_at
+        self.modified_at = updated_at
+        self.last_modified = formatdate(updated_at, usegmt=True)
+
+        self.gzip_body = None
+        self.br_body = None
+        if len(self.body) >= MIN_COMPRESS_SIZE:
+            self.gzip_body = gzip.compress(self.body, compresslevel=GZIP_LEVEL)
+            if brotli is not None:
+                self.br_body = brotli.compress(self.body, quality=BROTLI_QUALITY)
+
+
+class CachedData:
+    """직렬화 없이 원본 객체만 보관 (응답 전에 다시 거르는 라우트용: bbox, open_at)"""
+
+    __slots__ = ("version", "built_at", "data")
+
+    def __init__(self, version, updated_at, obj, previous=None):
+        self.version = version
+        self.built_at = time.time()
+        self.data = obj
+
+
+class PayloadCache:
+    """(엔드포인트, 키) → CachedPayload. 세대 번호가 바뀌었거나 max_age 가 지난 항목은 다시 만듭니다."""
+
+    def __init__(self, max_entries=MAX_ENTRIES, entry_class=CachedPayload):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.entry_class = entry_class
+
+    def get_or_build(self, key, builder, max_age=None):
+        version = data_generation.version
+        previous = self._entries.get(key)
+        if previous is not None and previous.version == version and (
+                max_age is None or time.time() - previous.built_at < max_age):
+            return previous
+
+        entry = self.entry_class(version, data_generation.updated_at, builder(), previous)
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                # 가장 오래 전에 들어온 항목부터 제거
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = entry
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+payload_cache = PayloadCache()
+# 압축 본문이 필요 없는 목록 캐시 (payload_cache 와 키 공간을 나눠 서로 밀어내지 않음)
+data_cache = PayloadCache(entry_class=CachedData)
+
+
+def _is_not_modified(entry):
+    """조건부 GET 판정 (If-None-Match 가 있으면 If-Modified-Since 는 무시)"""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(entry.etag)
+
+    since = request.if_modified_since
+    if since is not None:
+        return int(since.timestamp()) >= int(entry.modified_at)
+    return False
+
+
+def payload_response(entry, policy):
+    """CachedPayload 를 요청의 Accept-Encoding 에 맞춰 Response 로 만듭니다."""
+    headers = {
+        "ETag": f'"{entry.etag}"',
+        "Last-Modified": entry.last_modified,
+        "Cache-Control": CACHE_CONTROL.get(policy, DEFAULT_CACHE_CONTROL),
+        "Vary": "Accept-Encoding",
+    }
+
+    if _is_not_modified(entry):
+        return Response(status=304, headers=headers)
+
+    body = entry.body
+    accept = request.accept_encodings
+    if entry.br_body is not None and accept.quality("br") > 0:
+        body = entry.br_body
+        headers["Content-Encoding"] = "br"
+    elif entry.gzip_body is not None and accept.quality("gzip") > 0:
+        body = entry.gzip_body
+        headers["Content-Encoding"] = "gzip"
+
+    return Response(body, status=200, headers=headers, mimetype="application/json")
+
+
+def cached_json(policy, key, builder):
+    """
+    builder() 결과를 캐시해 두고 조건부/압축 응답으로 반환합니다.
+    builder 에서 발생한 예외는 그대로 전달되므로 호출하는 라우트에서 처리합니다.
+    """
+    entry = payload_cache.get_or_build((policy,) + tuple(key), builder, PAYLOAD_MAX_AGE.get(policy))
+    return payload_response(entry, policy)
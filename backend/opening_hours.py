@@ -0,0 +1,175 @@
+"""
+운영 시간 인덱스
+
+GraphDB 의 dayOfWeek / opens / closes 값을 시설별 "주간 구간 집합"으로 한 번만 파싱해 둡니다.
+구간은 월요일 00:00 부터의 분(0 ~ 10080) 단위 [시작, 끝) 이며, 정렬·병합되어 있어
+"지금 열려 있나?"를 이진 탐색 한 번으로 판단합니다.
+
+- 자정을 넘기는 영업(예: 22:00 ~ 02:00)은 다음 날로 이어지는 구간으로 저장
+- 일요일 밤 → 월요일 새벽처럼 주를 넘기는 구간은 주 처음으로 이어 붙임
+- 시간 정보가 없는 요일은 "알 수 없음"이므로 열려 있다고 보지 않음
+"""
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+
+DAY_ORDER = {
+    "Monday": 1, "Tuesday": 2, "Wednesday": 3, "Thursday": 4, "Friday": 5, "Saturday": 6, "Sunday": 7,
+    "Mon": 1, "Tue": 2, "Wed": 3, "Thu": 4, "Fri": 5, "Sat": 6, "Sun": 7,
+    "월": 1, "화": 2, "수": 3, "목": 4, "금": 5, "토": 6, "일": 7,
+}
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# 한국은 서머타임이 없으므로 고정 오프셋 사용 (Windows 에서 tzdata 없이도 동작)
+KST = timezone(timedelta(hours=9), "KST")
+
+
+def day_index(day):
+    """"Monday" / "Mon" / "월" / "http://schema.org/Monday" → 0(월) ~ 6(일), 모르면 None"""
+    if not day:
+        return None
+    name = day.split("/")[-1].split("#")[-1].strip()
+    order = DAY_ORDER.get(name) or DAY_ORDER.get(name[:3].title()) or DAY_ORDER.get(name[:1])
+    return order - 1 if order else None
+
+
+def parse_minutes(value):
+    """"09:00" / "09:00:00" / "24:00" → 하루 기준 분, 형식이 다르면 None"""
+    if not value:
+        return None
+    try:
+        hour, minute = value.strip()[:5].split(":")
+        minutes = int(hour) * 60 + int(minute)
+    except ValueError:
+        return None
+    return minutes if 0 <= minutes <= MINUTES_PER_DAY else None
+
+
+def minute_of_week(when):
+    """datetime → 월요일 00:00(KST) 부터의 분. naive datetime 은 KST 로 간주합니다."""
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=KST)
+    when = when.astimezone(KST)
+    return when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+
+def parse_open_at(value):
+    """쿼리 파라미터 open_at ("now" 또는 ISO 8601) → datetime, 형식이 틀리면 ValueError"""
+    if value in (None, "", "now"):
+        return datetime.now(KST)
+    return datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+
+
+class WeeklyHours:
+    """한 시설의 주간 영업 구간 (정렬·병합된 [시작, 끝) 목록)"""
+
+    __slots__ = ("starts", "ends")
+
+    def __init__(self, intervals):
+        merged = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [s for s, _ in merged]
+        self.ends = [e for _, e in merged]
+
+    @classmethod
+    def from_rows(cls, rows):
+        """rows: (day, opens, closes) 목록"""
+        intervals = []
+        for day, opens, closes in rows:
+            d = day_index(day)
+            start, end = parse_minutes(opens), parse_minutes(closes)
+            if d is None or start is None or end is None:
+                continue
+            if end <= start:
+                end += MINUTES_PER_DAY  # 자정을 넘기는 영업 (00:00 ~ 00:00 은 24시간)
+            start += d * MINUTES_PER_DAY
+            end += d * MINUTES_PER_DAY
+            if end > MINUTES_PER_WEEK:
+                intervals.append((start, MINUTES_PER_WEEK))
+                intervals.append((0, end - MINUTES_PER_WEEK))
+            else:
+                intervals.append((start, end))
+        return cls(intervals)
+
+    def is_open(self, minute):
+        i = bisect_right(self.starts, minute) - 1
+        return i >= 0 and minute < self.ends[i]
+
+    def __bool__(self):
+        return bool(self.starts)
+
+
+class HoursIndex:
+    """시설 ID → WeeklyHours"""
+
+    def __init__(self, rows, generation=None):
+        """rows: (facility, day, opens, closes) 목록"""
+        grouped = {}
+        for facility, day, opens, closes in rows:
+            grouped.setdefault(facility, []).append((day, opens, closes))
+        self.generation = generation
+        self.built_at = time.time()
+        self._hours = {}
+        for facility, facility_rows in grouped.items():
+            weekly = WeeklyHours.from_rows(facility_rows)
+            if weekly:
+                self._hours[facility] = weekly
+
+    def __len__(self):
+        return len(self._hours)
+
+    def get(self, facility_id):
+        return self._hours.get(facility_id)
+
+    def is_open(self, facility_id, when):
+        weekly = self._hours.get(facility_id)
+        return weekly is not None and weekly.is_open(minute_of_week(when))
+
+    def filter_open(self, facilities, when, key="id"):
+        """facilities 중 when 시각에 영업 중인 것만 반환"""
+        minute = minute_of_week(when)
+        result = []
+        for facility in facilities:
+            weekly = self._hours.get(facility[key])
+            if weekly is not None and weekly.is_open(minute):
+                result.append(facility)
+        return result
+
+
+_lock = threading.Lock()
+_index = None
+
+
+def _is_fresh(index, generation, max_age):
+    return index is not None and index.generation == generation and time.time() - index.built_at < max_age
+
+
+def get_hours_index():
+    """데이터 세대별로 한 번만 인덱스를 만듭니다. (스냅샷 → 없으면 GraphDB 일괄 조회)
+    세대가 그대로여도 시설 목록 캐시와 같은 최대 보관 시간이 지나면 다시 만듭니다.
+    (스냅샷/변경 이력이 없으면 세대가 바뀌지 않으므로, 재색인 중 받은 빈 결과가 계속 남지 않도록)"""
+    global _index
+    from http_cache import PAYLOAD_MAX_AGE, data_generation
+    from snapshot import get_snapshot, export_hours
+
+    generation = data_generation.version
+    max_age = PAYLOAD_MAX_AGE["facilities"]
+    if _is_fresh(_index, generation, max_age):
+        return _index
+
+    with _lock:
+        if not _is_fresh(_index, generation, max_age):
+            snap = get_snapshot()
+            if snap is not None:
+                rows = [(r["facility"], r["day"], r["opens"], r["closes"]) for r in snap.rows("hours")]
+            else:
+                rows = export_hours()
+            _index = HoursIndex(rows, generation)
+            print(f"🕒 [운영시간 인덱스] 시설 {len(_index)}곳 (generation={generation})")
+    return _index
@@ -0,0 +1,83 @@
+"""
+지연 초기화 서비스
+
+무거운 의존성은 처음 쓰는 순간에 import / 생성합니다.
+- Gemini SDK (google.generativeai: gRPC/protobuf 스택) → /api/chat 첫 호출 시
+- SPARQL 클라이언트(KnowledgeGraph, SPARQLWrapper) → 첫 쿼리 시
+- requests 세션 → 첫 외부 HTTP 호출 시 (스레드별, 커넥션 재사용)
+
+따라서 워커 부팅(import app)은 Flask 와 표준 라이브러리 수준으로 가볍게 유지됩니다.
+startup_bench.py 가 이 조건을 확인합니다.
+"""
+import os
+import threading
+
+_lock = threading.Lock()
+_local = threading.local()
+
+_genai = None
+_configured_key = None
+_models = {}
+_kg = None
+
+
+def get_genai():
+    """google.generativeai 모듈 (첫 호출 시 import)"""
+    global _genai
+    if _genai is None:
+        with _lock:
+            if _genai is None:
+                import google.generativeai as genai
+                _genai = genai
+    return _genai
+
+
+def get_chat_model(api_key, model_name='gemini-2.5-flash', system_instruction=None):
+    """API 키로 설정된 Gemini 모델. 키가 바뀌지 않으면 같은 객체를 재사용합니다.
+    system_instruction 은 모델에 한 번만 설정되어 요청 본문에 매번 넣지 않아도 됩니다."""
+    global _configured_key
+    genai = get_genai()
+    with _lock:
+        if api_key != _configured_key:
+            endpoint = os.getenv("GEMINI_API_ENDPOINT")
+            if endpoint:
+                # 벤치마크/테스트용 로컬 LLM 서버 (REST 전송만 지원)
+                genai.configure(api_key=api_key, transport="rest",
+                                client_options={"api_endpoint": endpoint})
+            else:
+                genai.configure(api_key=api_key)
+            _configured_key = api_key
+            _models.clear()
+        key = (model_name, system_instruction)
+        model = _models.get(key)
+        if model is None:
+            model = _models[key] = genai.GenerativeModel(model_name, system_instruction=system_instruction)
+    return model
+
+
+def get_knowledge_graph():
+    """KnowledgeGraph (첫 호출 시 생성, SPARQLWrapper 는 스레드별로 다시 지연 생성)"""
+    global _kg
+    if _kg is None:
+        with _lock:
+            if _kg is None:
+                from sparql_client import KnowledgeGraph
+                _kg = KnowledgeGraph()
+    return _kg
+
+
+def get_http_session():
+    """현재 스레드 전용 requests.Session (Keep-Alive 로 커넥션 재사용)"""
+    session = getattr(_local, "session", None)
+    if session is None:
+        import requests
+        session = _local.session = requests.Session()
+        session.hooks["response"].append(_record_response)
+    return session
+
+
+def _record_response(response, *args, **kwargs):
+    """요청 트레이스 수집 중이면 외부 HTTP 호출 시간을 호스트별로 기록"""
+    from urllib.parse import urlparse
+    from traffic_capture import record_upstream
+    record_upstream(f"http:{urlparse(response.url).hostname}", response.elapsed.total_seconds() * 1000.0)
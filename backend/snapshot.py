@@ -0,0 +1,506 @@
+"""
+지식 그래프 스냅샷 (컬럼형, 문자열 인터닝, mmap 공유)
+
+GraphDB 에서 백엔드가 조회하는 서브그래프(시설, 운영시간, 펫 이름 통계, 질병)를
+오프라인으로 한 번 내보내 하나의 바이너리 파일로 저장합니다.
+각 워커는 파일을 읽기 전용으로 mmap 하므로 워커가 N개여도 물리 메모리는 한 벌만 쓰고,
+시작 시에는 헤더만 읽어 수 ms 안에 준비됩니다.
+
+빌드:
+    python snapshot.py build [--out data/kg_snapshot.bin]
+
+파일 구조:
+    MAGIC(8) | 헤더 길이(u32) | 헤더(JSON) | 문자열 테이블 | 테이블 컬럼 배열...
+    - 문자열은 정렬 후 한 번만 저장(인터닝)하고, 컬럼에는 int32 문자열 번호만 저장합니다.
+    - 문자열이 정렬되어 있으므로 이진 탐색으로 문자열 → 번호를 찾을 수 있습니다.
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+MAGIC = b"KGSNAP01"
+HEADER_LEN = struct.Struct("<I")
+NULL = -1
+
+GRAPHDB_ENDPOINT = os.getenv("GRAPHDB_URL", "http://localhost:7200/repositories/knowledgemap")
+SNAPSHOT_PATH = os.getenv(
+    "KG_SNAPSHOT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "kg_snapshot.bin"),
+)
+
+# 테이블 스키마: 컬럼 이름 → 타입 (s: 문자열 번호 int32, i: int32, d: float64)
+SCHEMA = {
+    # 구(gu) 순으로 정렬 → 구별 행 범위를 헤더 인덱스에 저장
+    "facilities": {
+        "id": "s", "name": "s", "address": "s", "tel": "s",
+        "lat": "d", "lng": "d", "desc": "s", "category": "s", "gu": "s",
+    },
+    # 시설 번호 순으로 정렬 → 이진 탐색
+    "hours": {"facility": "s", "day": "s", "opens": "s", "closes": "s"},
+    # 시설 상세(모든 술어, 키는 술어 URI 의 끝 이름), 시설 번호 순 → 이진 탐색
+    "facility_props": {"facility": "s", "key": "s", "value": "s"},
+    # 구 순, 구 안에서는 개수 내림차순
+    "pet_names": {"gu": "s", "name": "s", "count": "i"},
+    # 동물 URI 순으로 정렬 → 이진 탐색
+    "diseases": {"animal": "s", "disease": "s", "symptom": "s"},
+}
+ARRAY_TYPECODES = {"s": "i", "i": "i", "d": "d"}
+
+
+# ============================================================
+# 빌드 (오프라인)
+# ============================================================
+
+def _select(query):
+    import requests
+
+    res = requests.get(
+        GRAPHDB_ENDPOINT,
+        params={"query": query},
+        headers={"Accept": "application/sparql-results+json"},
+    )
+    res.raise_for_status()
+    return res.json()["results"]["bindings"]
+
+
+def _value(binding, key, default=None):
+    return binding.get(key, {}).get("value", default)
+
+
+def _local_name(uri):
+    return uri.split("/")[-1].split("#")[-1] if uri else uri
+
+
+def export_facilities():
+    from graphdb_api import gu_map
+    uri_to_gu = {uri: gu for gu, uri in gu_map.items()}
+
+    bindings = _select("""
+    PREFIX schema: <http://schema.org/>
+    PREFIX koad: <http://vocab.datahub.kr/def/administrative-division/>
+    PREFIX koah: <https://knowledgemap.kr/koah/def/>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+    SELECT ?facility ?name ?address ?tel ?lat ?long ?desc ?category ?gu
+    WHERE {
+        ?facility a koah:AnimalFacility ;
+                  rdfs:label ?name ;
+                  schema:streetAddress ?address ;
+                  schema:telephone ?tel ;
+                  schema:latitude ?lat ;
+                  schema:longitude ?long ;
+                  schema:description ?desc ;
+                  koad:Gu ?gu .
+        OPTIONAL { ?facility koah:category ?category . }
+    }
+    """)
+
+    rows = []
+    for b in bindings:
+        gu = uri_to_gu.get(_value(b, "gu"))
+        if gu is None:
+            continue
+        rows.append((
+            _value(b, "facility"), _value(b, "name"), _value(b, "address"), _value(b, "tel"),
+            float(_value(b, "lat")), float(_value(b, "long")), _value(b, "desc"),
+            _local_name(_value(b, "category", "")), gu,
+        ))
+    rows.sort(key=lambda r: (r[8], r[0], r[7]))
+    return rows
+
+
+def export_hours():
+    bindings = _select("""
+    PREFIX koah: <https://knowledgemap.kr/koah/def/>
+
+    SELECT ?facility ?day ?open ?close
+    WHERE {
+        ?facility a koah:AnimalFacility .
+        {
+            ?facility ?pDay ?day .
+            FILTER (STRENDS(STR(?pDay), "dayOfWeek"))
+            OPTIONAL { ?facility ?pOpen ?open . FILTER (STRENDS(STR(?pOpen), "opens")) }
+            OPTIONAL { ?facility ?pClose ?close . FILTER (STRENDS(STR(?pClose), "closes")) }
+        }
+        UNION
+        {
+            ?hoursNode ?pFac ?facility .
+            ?hoursNode ?pDay ?day .
+            FILTER (STRENDS(STR(?pDay), "dayOfWeek"))
+            OPTIONAL { ?hoursNode ?pOpen ?open . FILTER (STRENDS(STR(?pOpen), "opens")) }
+            OPTIONAL { ?hoursNode ?pClose ?close . FILTER (STRENDS(STR(?pClose), "closes")) }
+        }
+    }
+    """)
+
+    rows = {(_value(b, "facility"), _local_name(_value(b, "day")), _value(b, "open"), _value(b, "close"))
+            for b in bindings}
+    return sorted(rows, key=lambda r: tuple(v or "" for v in r))
+
+
+def export_facility_props():
+    bindings = _select("""
+    PREFIX koah: <https://knowledgemap.kr/koah/def/>
+
+    SELECT ?facility ?p ?o
+    WHERE {
+        ?facility a koah:AnimalFacility ;
+                  ?p ?o .
+    }
+    """)
+
+    rows = {(_value(b, "facility"), _local_name(_value(b, "p")), _value(b, "o")) for b in bindings}
+    return sorted(rows)
+
+
+def export_pet_names():
+    bindings = _select("""
+    PREFIX koah: <http://knowledgemap.kr/koah/def/>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
+
+    SELECT ?s ?name ?count WHERE {
+        ?s a koah:PetNameStatistic ;
+           rdfs:label ?name ;
+           rdf:value ?count .
+    }
+    """)
+
+    rows = []
+    for b in bindings:
+        # 예: http://knowledgemap.kr/koah/stat/송파구/코코
+        parts = _value(b, "s").split("/stat/", 1)
+        if len(parts) != 2:
+            continue
+        rows.append((parts[1].split("/")[0], _value(b, "name"), int(float(_value(b, "count")))))
+    rows.sort(key=lambda r: (r[0], -r[2], r[1]))
+    return rows
+
+
+def export_diseases():
+    bindings = _select("""
+    PREFIX koah: <http://knowledgemap.kr/koah/def/>
+    PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
+    PREFIX schema: <http://schema.org/>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+    SELECT ?animal ?diseaseName ?symptomName WHERE {
+        ?diseaseURI koah:animal ?animal .
+        OPTIONAL {
+            ?diseaseURI skos:broader ?symptomURI .
+            ?symptomURI rdfs:label ?symptomName .
+        }
+        OPTIONAL { ?diseaseURI rdfs:label ?label1 }
+        OPTIONAL { ?diseaseURI skos:prefLabel ?label2 }
+        OPTIONAL { ?diseaseURI schema:name ?label3 }
+        OPTIONAL { ?diseaseURI <http://knowledgemap.kr/koah/def/name> ?label4 }
+        BIND(COALESCE(?label1, ?label2, ?label3, ?label4, "이름 없음") AS ?diseaseName)
+    }
+    """)
+
+    rows = {(_value(b, "animal"), _value(b, "diseaseName"), _value(b, "symptomName")) for b in bindings}
+    return sorted(rows, key=lambda r: tuple(v or "" for v in r))
+
+
+def _pad(buf):
+    buf.extend(b"\0" * (-len(buf) % 8))
+
+
+def write_snapshot(path, tables, generation):
+    """tables: {테이블 이름: [행 튜플, ...]} (행 순서는 SCHEMA 컬럼 순서)"""
+    strings = set()
+    for name, rows in tables.items():
+        for idx, kind in enumerate(SCHEMA[name].values()):
+            if kind == "s":
+                strings.update(r[idx] for r in rows if r[idx] is not None)
+
+    # 파이썬 문자열 정렬 = UTF-8 바이트 정렬 이므로 읽을 때 바이트 비교로 이진 탐색 가능
+    strings = sorted(strings)
+    string_ids = {s: i for i, s in enumerate(strings)}
+
+    data = bytearray()
+    blob = bytearray()
+    offsets = array("i", [0])
+    for s in strings:
+        blob.extend(s.encode("utf-8"))
+        offsets.append(len(blob))
+
+    header = {
+        "generation": generation,
+        "built_at": time.time(),
+        "byteorder": sys.byteorder,
+        "strings": {"count": len(strings)},
+        "tables": {},
+        "index": {},
+    }
+    # 데이터 영역 오프셋은 데이터 영역 시작 기준(헤더 길이와 무관)
+    header["strings"]["offsets"] = len(data)
+    data.extend(offsets.tobytes())
+    _pad(data)
+    header["strings"]["blob"] = len(data)
+    header["strings"]["blob_len"] = len(blob)
+    data.extend(blob)
+    _pad(data)
+
+    for name, rows in tables.items():
+        columns = {}
+        for idx, (col, kind) in enumerate(SCHEMA[name].items()):
+            if kind == "s":
+                values = array("i", (NULL if r[idx] is None else string_ids[r[idx]] for r in rows))
+            else:
+                values = array(ARRAY_TYPECODES[kind], (r[idx] for r in rows))
+            columns[col] = {"type": kind, "offset": len(data)}
+            data.extend(values.tobytes())
+            _pad(data)
+        header["tables"][name] = {"rows": len(rows), "columns": columns}
+
+    # 구별 행 범위 인덱스
+    for name, gu_idx, index_name in (("facilities", 8, "facilities_by_gu"), ("pet_names", 0, "pet_names_by_gu")):
+        ranges = {}
+        for i, r in enumerate(tables.get(name, [])):
+            start, _ = ranges.get(r[gu_idx], (i, i))
+            ranges[r[gu_idx]] = (start, i + 1)
+        header["index"][index_name] = ranges
+
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    prefix = bytearray(MAGIC + HEADER_LEN.pack(len(header_bytes)) + header_bytes)
+    _pad(prefix)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(prefix)
+        f.write(data)
+    # 실행 중인 워커가 mmap 한 기존 파일은 그대로 두고 새 파일로 교체
+    os.replace(tmp_path, path)
+    return header
+
+
+def build(path=SNAPSHOT_PATH, generation=None):
+    """GraphDB 에서 서브그래프를 내보내 스냅샷 파일을 만듭니다."""
+    started = time.time()
+    tables = {
+        "facilities": export_facilities(),
+        "hours": export_hours(),
+        "facility_props": export_facility_props(),
+        "pet_names": export_pet_names(),
+        "diseases": export_diseases(),
+    }
+    if generation is None:
+        generation = int(started)
+    header = write_snapshot(path, tables, generation)
+
+    print(f"📦 [스냅샷] {path} 생성 완료 ({time.time() - started:.1f}s, generation={generation})")
+    for name, meta in header["tables"].items():
+        print(f"   - {name}: {meta['rows']}행")
+    print(f"   - 문자열: {header['strings']['count']}개, 파일 크기: {os.path.getsize(path) / 1024:.1f}KB")
+    return header
+
+
+# ============================================================
+# 읽기 (워커)
+# ============================================================
+
+class Snapshot:
+    """읽기 전용 mmap 스냅샷. 컬럼은 memoryview 로 복사 없이 접근합니다."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"스냅샷 파일 형식이 아닙니다: {path}")
+        (header_len,) = HEADER_LEN.unpack_from(self._mm, len(MAGIC))
+        header_start = len(MAGIC) + HEADER_LEN.size
+        header = json.loads(self._mm[header_start:header_start + header_len].decode("utf-8"))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError("스냅샷 바이트 순서가 현재 시스템과 다릅니다. 다시 빌드하세요.")
+
+        data_start = header_start + header_len
+        data_start += -data_start % 8
+        self._view = memoryview(self._mm)[data_start:]
+
+        self.generation = header["generation"]
+        self.built_at = header["built_at"]
+        self.index = header["index"]
+        self._tables = header["tables"]
+
+        strings = header["strings"]
+        self._string_count = strings["count"]
+        self._string_offsets = self._array(strings["offsets"], "i", self._string_count + 1)
+        self._blob = self._view[strings["blob"]:strings["blob"] + strings["blob_len"]]
+
+    def _array(self, offset, typecode, count):
+        size = array(typecode).itemsize
+        return self._view[offset:offset + size * count].cast(typecode)
+
+    # ---------- 문자열 ----------
+
+    def _string_bytes(self, sid):
+        return self._blob[self._string_offsets[sid]:self._string_offsets[sid + 1]]
+
+    def string(self, sid):
+        if sid == NULL:
+            return None
+        return bytes(self._string_bytes(sid)).decode("utf-8")
+
+    def find_string(self, text):
+        """문자열 → 번호 (없으면 NULL). 정렬된 문자열 테이블을 이진 탐색합니다."""
+        target = text.encode("utf-8")
+        lo, hi = 0, self._string_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(self._string_bytes(mid)) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._string_count and bytes(self._string_bytes(lo)) == target:
+            return lo
+        return NULL
+
+    # ---------- 테이블 ----------
+
+    def row_count(self, table):
+        return self._tables[table]["rows"]
+
+    def column(self, table, col):
+        meta = self._tables[table]
+        spec = meta["columns"][col]
+        return self._array(spec["offset"], ARRAY_TYPECODES[spec["type"]], meta["rows"])
+
+    def rows(self, table, start=0, end=None):
+        """행 범위를 dict 목록으로 디코딩합니다."""
+        if end is None:
+            end = self.row_count(table)
+        decoded = {}
+        for col, kind in SCHEMA[table].items():
+            values = self.column(table, col)[start:end]
+            decoded[col] = [self.string(v) for v in values] if kind == "s" else list(values)
+        return [{col: decoded[col][i] for col in decoded} for i in range(end - start)]
+
+    def _equal_range(self, table, col, text):
+        sid = self.find_string(text)
+        if sid == NULL:
+            return 0, 0
+        values = self.column(table, col)
+        return bisect_left(values, sid), bisect_right(values, sid)
+
+    # ---------- 도메인 조회 ----------
+
+    def facilities_in_gu(self, gu, category=None):
+        """gu 가 None 이면 서울 전체"""
+        if gu is None:
+            start, end = 0, self.row_count("facilities")
+        else:
+            start, end = self.index["facilities_by_gu"].get(gu, (0, 0))
+        facilities = []
+        seen = set()
+        for row in self.rows("facilities", start, end):
+            if category and row["category"] != category:
+                continue
+            if row["id"] in seen:
+                continue
+            seen.add(row["id"])
+            row.pop("gu")
+            facilities.append(row)
+        return facilities
+
+    def hours(self, facility_id):
+        start, end = self._equal_range("hours", "facility", facility_id)
+        return self.rows("hours", start, end)
+
+    def facility_detail(self, facility_id):
+        """시설의 {술어 이름: 값}. 이 테이블이 없는 이전 스냅샷이거나 시설이 없으면 None"""
+        if "facility_props" not in self._tables:
+            return None
+        start, end = self._equal_range("facility_props", "facility", facility_id)
+        if start == end:
+            return None
+        return {row["key"]: row["value"] for row in self.rows("facility_props", start, end)}
+
+    def pet_names(self, gu, limit=10):
+        start, end = self.index["pet_names_by_gu"].get(gu, (0, 0))
+        return [{"name": r["name"], "count": r["count"]}
+                for r in self.rows("pet_names", start, min(end, start + limit))]
+
+    def medical_info(self, animal_uri, limit=10):
+        start, end = self._equal_range("diseases", "animal", animal_uri)
+        return self.rows("diseases", start, min(end, start + limit))
+
+
+_NOT_LOADED = object()
+_snapshot = _NOT_LOADED
+_load_lock = threading.Lock()
+_load_listeners = []
+
+
+def on_load(callback):
+    """스냅샷을 연 직후 callback(snapshot) 을 호출합니다. (세대 번호 동기화 등)"""
+    _load_listeners.append(callback)
+
+
+def reset_snapshot():
+    """다음 get_snapshot() 때 파일을 다시 열도록 합니다. (fork 직후 워커에서 호출)"""
+    global _snapshot
+    with _load_lock:
+        _snapshot = _NOT_LOADED
+
+
+def get_snapshot():
+    """프로세스당 한 번만 스냅샷을 열어 봅니다. 파일이 없거나 손상되었으면 None (SPARQL 로 대체).
+    실패한 결과도 기억하므로 스냅샷 없이 운영할 때 요청마다 파일을 확인하지 않습니다."""
+    global _snapshot
+    snap = _snapshot
+    if snap is _NOT_LOADED:
+        with _load_lock:
+            if _snapshot is _NOT_LOADED:
+                _snapshot = _open_snapshot(SNAPSHOT_PATH)
+            snap = _snapshot
+    return snap
+
+
+def _open_snapshot(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        snap = Snapshot(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ [스냅샷] 로드 실패, SPARQL 로 조회합니다: {e}")
+        return None
+    print(f"📦 [스냅샷] 로드 완료 (generation={snap.generation})")
+    for callback in _load_listeners:
+        callback(snap)
+    return snap
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="지식 그래프 스냅샷 빌드/확인")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="GraphDB 에서 스냅샷 파일 생성")
+    p_build.add_argument("--out", default=SNAPSHOT_PATH)
+    p_build.add_argument("--generation", type=int, default=None)
+
+    p_info = sub.add_parser("info", help="스냅샷 파일 요약 출력")
+    p_info.add_argument("--path", default=SNAPSHOT_PATH)
+
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        build(args.out, args.generation)
+    else:
+        snap = Snapshot(args.path)
+        print(f"generation={snap.generation}, built_at={time.ctime(snap.built_at)}")
+        for name in SCHEMA:
+            print(f"   - {name}: {snap.row_count(name)}행")
+
+
+if __name__ == "__main__":
+    main()
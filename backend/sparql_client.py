@@ -1,18 +1,43 @@
-from SPARQLWrapper import SPARQLWrapper, JSON
+import os
+import threading
 
 # GraphDB 설정 (로컬 실행 기준)
 # 저장소 이름이 'animalloo-repo'가 아니라면 본인 설정에 맞게 수정하세요.
-GRAPHDB_URL = "http://localhost:7200/repositories/knowledgemap"
+GRAPHDB_URL = os.getenv("GRAPHDB_URL", "http://localhost:7200/repositories/knowledgemap")
+
+# SPARQLWrapper 는 setQuery() 로 상태를 바꾸므로 스레드끼리 공유하면 쿼리가 섞입니다.
+# 스레드(워커 스레드)마다 하나씩 만들어 씁니다.
+_local = threading.local()
+
+
+def get_sparql(endpoint=GRAPHDB_URL):
+    """현재 스레드 전용 SPARQLWrapper (JSON 결과 포맷)"""
+    clients = getattr(_local, "clients", None)
+    if clients is None:
+        clients = _local.clients = {}
+    client = clients.get(endpoint)
+    if client is None:
+        # SPARQLWrapper 는 첫 쿼리 때 import (워커 부팅 시간 단축)
+        from SPARQLWrapper import SPARQLWrapper, JSON
+        client = clients[endpoint] = SPARQLWrapper(endpoint)
+        client.setReturnFormat(JSON)
+        client.query = _timed_query(client.query)
+    return client
+
+
+def _timed_query(query):
+    """요청 트레이스 수집 중이면 SPARQL 호출 시간(응답 헤더 수신까지)을 기록"""
+    from traffic_capture import upstream_call
+
+    def timed():
+        with upstream_call("sparql"):
+            return query()
+    return timed
+
 
 class KnowledgeGraph:
     def __init__(self):
-        # 1. [중요] SPARQLWrapper 객체 생성 (이 줄이 없어서 에러가 난 것입니다!)
-        self.sparql = SPARQLWrapper(GRAPHDB_URL)
-        
-        # 2. 결과 포맷 설정
-        self.sparql.setReturnFormat(JSON)
-        
-        # 3. Prefix 설정 (http + knowledgemap.kr)
+        # Prefix 설정 (http + knowledgemap.kr)
         self.prefixes = """
         PREFIX koah: <http://knowledgemap.kr/koah/def/>
         PREFIX koad: <http://vocab.datahub.kr/def/administrative-division/>
@@ -22,6 +47,11 @@ class KnowledgeGraph:
         PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
         """
 
+    @property
+    def sparql(self):
+        # 스레드마다 별도의 SPARQLWrapper 사용 (멀티 스레드 워커에서 안전)
+        return get_sparql(GRAPHDB_URL)
+
     def query(self, query_body):
         """SPARQL 쿼리 실행 및 결과 파싱"""
         full_query = self.prefixes + query_body
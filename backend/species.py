@@ -0,0 +1,132 @@
+"""
+종(species) / 품종(breed) 정규화
+
+서울시 vPetInfo 의 ANIMAL_TYPE / ANIMAL_BREED 값(예: "[개] 믹스견", "골든 리트리버", "CAT")을
+종 URI(Wikidata) + 표준 품종명으로 정규화합니다.
+
+- 품종 사전을 하나의 정규식(긴 별칭 우선)으로 컴파일해 한 번의 스캔으로 매칭
+- 품종이 안 잡히면 종 키워드(utils.ANIMAL_MAP + 추가 키워드)로 판별, 가장 긴 키워드 우선
+- 같은 문자열은 LRU 캐시(크기 제한)로 재사용, 한 페이지 안의 중복 값은 한 번만 분류
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+from utils import ANIMAL_MAP
+
+DOG_URI = "http://www.wikidata.org/entity/Q144"
+CAT_URI = "http://www.wikidata.org/entity/Q146"
+
+SPECIES_URIS = {"개": DOG_URI, "고양이": CAT_URI}
+SPECIES_BY_URI = {uri: name for name, uri in SPECIES_URIS.items()}
+
+SpeciesInfo = namedtuple("SpeciesInfo", ["species", "species_uri", "breed"])
+UNKNOWN = SpeciesInfo(None, None, None)
+
+# 표준 품종명 → (종, 별칭 목록). 별칭은 공백 제거 + 소문자 기준으로 비교합니다.
+BREEDS = {
+    # ---- 개 ----
+    "믹스견": ("개", ["믹스견", "믹스", "잡종견", "혼종견", "mix", "mixed"]),
+    "말티즈": ("개", ["말티즈", "몰티즈", "maltese"]),
+    "푸들": ("개", ["푸들", "토이푸들", "미니어처푸들", "스탠다드푸들", "poodle"]),
+    "포메라니안": ("개", ["포메라니안", "포메", "pomeranian"]),
+    "시츄": ("개", ["시츄", "시추", "shihtzu"]),
+    "치와와": ("개", ["치와와", "chihuahua"]),
+    "비숑 프리제": ("개", ["비숑프리제", "비숑프리즈", "비숑", "bichon"]),
+    "요크셔테리어": ("개", ["요크셔테리어", "요크셔", "요키", "yorkshire"]),
+    "닥스훈트": ("개", ["닥스훈트", "닥스훈드", "dachshund"]),
+    "웰시코기": ("개", ["웰시코기", "코기", "corgi"]),
+    "골든리트리버": ("개", ["골든리트리버", "골든", "goldenretriever"]),
+    "래브라도리트리버": ("개", ["래브라도리트리버", "래브라도", "라브라도", "labrador"]),
+    "진돗개": ("개", ["진돗개", "진도개", "진도", "jindo"]),
+    "풍산개": ("개", ["풍산개", "풍산"]),
+    "삽살개": ("개", ["삽살개", "삽사리"]),
+    "시바견": ("개", ["시바견", "시바이누", "시바", "shiba"]),
+    "슈나우저": ("개", ["미니어처슈나우저", "슈나우저", "슈나우져", "schnauzer"]),
+    "비글": ("개", ["비글", "beagle"]),
+    "보더콜리": ("개", ["보더콜리", "bordercollie"]),
+    "프렌치불독": ("개", ["프렌치불독", "프렌치불도그", "frenchbulldog"]),
+    "페키니즈": ("개", ["페키니즈", "페키니스", "pekingese"]),
+    "스피츠": ("개", ["스피츠", "재패니즈스피츠", "spitz"]),
+    "셔틀랜드쉽독": ("개", ["셔틀랜드쉽독", "셸티", "sheltie"]),
+    "퍼그": ("개", ["퍼그", "pug"]),
+    "사모예드": ("개", ["사모예드", "samoyed"]),
+    "시베리안허스키": ("개", ["시베리안허스키", "허스키", "husky"]),
+    "불테리어": ("개", ["불테리어", "bullterrier"]),
+    "코카스패니얼": ("개", ["코카스파니엘", "코카스패니얼", "코카", "cockerspaniel"]),
+    # ---- 고양이 ----
+    "코리안숏헤어": ("고양이", ["코리안숏헤어", "코리안쇼트헤어", "코숏", "한국고양이"]),
+    "믹스묘": ("고양이", ["믹스묘", "잡종묘"]),
+    "페르시안": ("고양이", ["페르시안", "persian"]),
+    "러시안블루": ("고양이", ["러시안블루", "russianblue"]),
+    "스코티시폴드": ("고양이", ["스코티시폴드", "스코티쉬폴드", "scottishfold"]),
+    "브리티시숏헤어": ("고양이", ["브리티시숏헤어", "브리티쉬숏헤어", "britishshorthair"]),
+    "아메리칸숏헤어": ("고양이", ["아메리칸숏헤어", "americanshorthair"]),
+    "샴": ("고양이", ["샴", "siamese"]),
+    "먼치킨": ("고양이", ["먼치킨", "munchkin"]),
+    "아비시니안": ("고양이", ["아비시니안", "abyssinian"]),
+    "랙돌": ("고양이", ["랙돌", "렉돌", "ragdoll"]),
+    "노르웨이숲": ("고양이", ["노르웨이숲", "노르웨이지안포레스트", "norwegianforest"]),
+    "벵갈": ("고양이", ["벵갈", "뱅갈", "bengal"]),
+    "터키시앙고라": ("고양이", ["터키시앙고라", "터키쉬앙고라", "앙고라", "turkishangora"]),
+    "메인쿤": ("고양이", ["메인쿤", "mainecoon"]),
+    "스핑크스": ("고양이", ["스핑크스", "sphynx"]),
+}
+
+# 품종이 없을 때 종만 판별하는 키워드 (utils.ANIMAL_MAP 포함)
+SPECIES_KEYWORDS = {
+    **{key.lower().replace(" ", ""): SPECIES_BY_URI[uri] for key, uri in ANIMAL_MAP.items()},
+    "견": "개", "puppy": "개", "canine": "개",
+    "묘": "고양이", "냥이": "고양이", "kitten": "고양이", "feline": "고양이",
+}
+
+_NON_WORD = re.compile(r"[\s\-_·.]+")
+
+
+def _compile(keywords):
+    # 긴 별칭부터 시도해야 "골든리트리버"가 "골든"보다, "고양이"가 "묘"보다 먼저 잡힙니다.
+    ordered = sorted(keywords, key=len, reverse=True)
+    return re.compile("|".join(re.escape(k) for k in ordered))
+
+
+_BREED_ALIASES = {alias: canonical for canonical, (_, aliases) in BREEDS.items() for alias in aliases}
+_BREED_PATTERN = _compile(_BREED_ALIASES)
+_SPECIES_PATTERN = _compile(SPECIES_KEYWORDS)
+
+
+def _clean(text):
+    """공백/구분자 제거 + 소문자 ("[개] 골든 리트리버" → "[개]골든리트리버")"""
+    return _NON_WORD.sub("", text).lower() if text else ""
+
+
+@lru_cache(maxsize=4096)
+def normalize(animal_type, animal_breed=""):
+    """(ANIMAL_TYPE, ANIMAL_BREED) → SpeciesInfo(종, 종 URI, 표준 품종명)"""
+    text = _clean(animal_type) + "|" + _clean(animal_breed)
+
+    breed = None
+    match = _BREED_PATTERN.search(text)
+    if match:
+        breed = _BREED_ALIASES[match.group()]
+
+    # 종은 키워드를 우선 (예: "[고양이] 믹스" 의 "믹스"는 믹스견이 아니라 믹스묘)
+    species = None
+    match = _SPECIES_PATTERN.search(text)
+    if match:
+        species = SPECIES_KEYWORDS[match.group()]
+    elif breed:
+        species = BREEDS[breed][0]
+
+    if breed and BREEDS[breed][0] != species:
+        breed = "믹스묘" if breed == "믹스견" and species == "고양이" else None
+
+    if species is None:
+        return UNKNOWN
+    return SpeciesInfo(species, SPECIES_URIS.get(species), breed)
+
+
+def classify_rows(rows, type_field="ANIMAL_TYPE", breed_field="ANIMAL_BREED"):
+    """한 페이지의 vPetInfo 행을 한 번에 분류합니다. 행 순서대로 SpeciesInfo 목록을 반환."""
+    keys = [(row.get(type_field) or "", row.get(breed_field) or "") for row in rows]
+    resolved = {key: normalize(*key) for key in set(keys)}
+    return [resolved[key] for key in keys]
@@ -0,0 +1,126 @@
+"""
+워커 콜드 스타트 벤치마크 (import 시간 프로파일)
+
+`python -X importtime -c "import app"` 를 새 프로세스에서 실행해
+- import 시간 상위 모듈 보고서 (누적 시간 기준)
+- 전체 import 시간 / 프로세스 기동 시간
+을 출력하고, 아래 조건을 어기면 종료 코드 1 을 돌려줍니다 (CI 에서 회귀 검출용).
+    1. 지연 로드 대상 모듈(LAZY_MODULES)이 import 시점에 로드됨
+    2. 전체 import 시간이 예산(--budget-ms)을 초과
+
+사용:
+    python startup_bench.py                  # 보고서 + 검사
+    python startup_bench.py --repeat 5       # 5회 측정 후 중앙값 사용
+    python startup_bench.py --json out.json  # 결과 저장 (커밋 간 비교용)
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# import app 시점에 로드되면 안 되는 무거운 모듈 (services.py 에서 지연 로드)
+LAZY_MODULES = [
+    "google.generativeai",
+    "grpc",
+    "google.protobuf",
+    "SPARQLWrapper",
+    "requests",
+]
+
+DEFAULT_BUDGET_MS = 1500
+
+
+def run_importtime(target="app"):
+    """새 인터프리터에서 target 을 import 하고 (모듈 목록, 기동 시간 ms) 를 반환합니다.
+    target 이 None 이면 빈 인터프리터(site, encodings 등 기본 모듈)만 측정합니다."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    started = time.perf_counter()
+    code = f"import {target}" if target else "pass"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {target} 실패:\n{proc.stderr[-2000:]}")
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        # 형식: "import time: self [us] | cumulative | [들여쓰기]모듈"
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|", 2)
+        name = name[1:]  # 구분자 뒤 공백 한 칸 제거 → 나머지 들여쓰기가 중첩 깊이
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": depth,
+        })
+    return modules, wall_ms
+
+
+def summarize(modules, wall_ms, baseline=(), top=15):
+    # 인터프리터 기동 시 항상 로드되는 모듈(baseline)은 제외하고,
+    # 최상위 import(들여쓰기 0) 의 누적 시간 합 = target import 시간
+    modules = [m for m in modules if m["module"] not in baseline]
+    total_us = sum(m["cumulative_us"] for m in modules if m["depth"] == 0)
+    loaded = {m["module"] for m in modules}
+    eager = [name for name in LAZY_MODULES
+             if any(mod == name or mod.startswith(name + ".") for mod in loaded)]
+    return {
+        "total_import_ms": round(total_us / 1000, 1),
+        "wall_ms": round(wall_ms, 1),
+        "module_count": len(modules),
+        "eager_lazy_modules": eager,
+        "top": sorted(modules, key=lambda m: m["cumulative_us"], reverse=True)[:top],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="백엔드 워커 콜드 스타트 벤치마크")
+    parser.add_argument("--target", default="app")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", DEFAULT_BUDGET_MS)))
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args(argv)
+
+    baseline = {m["module"] for m in run_importtime(None)[0]}
+    runs = [summarize(*run_importtime(args.target), baseline=baseline, top=args.top)
+            for _ in range(args.repeat)]
+    result = runs[-1]
+    result["total_import_ms"] = statistics.median(r["total_import_ms"] for r in runs)
+    result["wall_ms"] = statistics.median(r["wall_ms"] for r in runs)
+
+    print(f"⏱️ [콜드 스타트] import {args.target}: {result['total_import_ms']}ms "
+          f"(프로세스 기동 {result['wall_ms']}ms, 모듈 {result['module_count']}개, {args.repeat}회 중앙값)")
+    print(f"{'누적(ms)':>10} {'자체(ms)':>10}  모듈")
+    for m in result["top"]:
+        print(f"{m['cumulative_us'] / 1000:>10.1f} {m['self_us'] / 1000:>10.1f}  {'  ' * m['depth']}{m['module']}")
+
+    failed = False
+    if result["eager_lazy_modules"]:
+        failed = True
+        print(f"❌ 지연 로드 대상이 import 시점에 로드됨: {', '.join(result['eager_lazy_modules'])}")
+    if result["total_import_ms"] > args.budget_ms:
+        failed = True
+        print(f"❌ import 시간 예산 초과: {result['total_import_ms']}ms > {args.budget_ms}ms")
+    if not failed:
+        print(f"✅ 예산 {args.budget_ms}ms 이내, 지연 로드 모듈 없음")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
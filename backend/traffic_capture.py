@@ -0,0 +1,184 @@
+"""
+요청 트레이스 수집 (재생 부하 테스트용)
+
+TRAFFIC_CAPTURE_PATH 를 설정하면 요청마다 한 줄씩 정제된 트레이스를 gzip JSON Lines 로 남깁니다.
+    TRAFFIC_CAPTURE_PATH=data/traffic     → data/traffic.<pid>.jsonl.gz (워커마다 별도 파일)
+    TRAFFIC_CAPTURE_SAMPLE=0.2            → 요청의 20%만 기록 (기본 1.0)
+
+한 줄 형식 (키를 짧게 유지):
+    {"t": 시작 시각(epoch 초), "m": 메서드, "r": 라우트, "p": 파라미터, "s": 상태 코드,
+     "d": 처리 시간(ms), "c": 익명 클라이언트 id, "n": 조건부 요청 여부(1),
+     "u": [[업스트림 종류, ms], ...]}
+
+정제 규칙
+- 쿼리 파라미터는 CAPTURE_PARAMS 에 있는 것만, 값은 최대 MAX_VALUE_CHARS 글자
+  (시설 id 는 URI 그대로 재생해야 하므로 자르지 않고 그대로 기록)
+- 검색어(q)의 숫자는 0 으로 치환 → 재생되는 검색어는 원래와 다를 수 있음 (결과 수/지연이 달라질 수 있음)
+- 챗봇 메시지 원문은 남기지 않고 매칭된 증상 키워드와 길이만 기록
+- 클라이언트 IP 는 솔트를 붙인 해시 앞부분만 기록
+
+재생은 bench/replay.py 가 담당합니다. 꺼져 있으면 훅 자체를 등록하지 않습니다.
+"""
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import request
+
+from chat_context import SYMPTOM_KEYWORDS
+
+CAPTURE_PATH = os.getenv("TRAFFIC_CAPTURE_PATH")
+SAMPLE_RATE = float(os.getenv("TRAFFIC_CAPTURE_SAMPLE", "1.0"))
+# preload 시 마스터에서 한 번 정해지므로 모든 워커가 같은 솔트를 씀 (같은 클라이언트 → 같은 id)
+CLIENT_SALT = os.getenv("TRAFFIC_CAPTURE_SALT") or os.urandom(16).hex()
+
+CAPTURE_PARAMS = {"gu", "category", "bbox", "open_at", "id", "q", "start", "end", "since"}
+VERBATIM_PARAMS = {"id"}   # 자르거나 바꾸면 다른 시설(또는 404)이 되는 값
+SCRUBBED_PARAMS = {"q"}    # 사용자가 자유롭게 입력하는 값
+MAX_VALUE_CHARS = 60
+FLUSH_EVERY = 200        # 이만큼 쌓이거나
+FLUSH_INTERVAL = 5.0     # 이 시간(초)이 지나면 파일에 씀
+
+_local = threading.local()
+
+
+def client_id(remote_addr):
+    return hashlib.sha256(f"{CLIENT_SALT}:{remote_addr}".encode("utf-8")).hexdigest()[:10]
+
+
+def _sanitize_value(key, value):
+    if key in VERBATIM_PARAMS:
+        return value
+    value = value[:MAX_VALUE_CHARS]
+    if key in SCRUBBED_PARAMS:
+        # 검색어에 섞인 전화번호/번지 같은 숫자는 지움
+        value = re.sub(r"\d", "0", value)
+    return value
+
+
+def sanitize_params(args):
+    return {key: _sanitize_value(key, value) for key, value in args.items() if key in CAPTURE_PARAMS}
+
+
+def sanitize_chat(body):
+    message = (body or {}).get("message") or ""
+    keyword = next((k for k in SYMPTOM_KEYWORDS if k in message), "")
+    return {"keyword": keyword, "length": len(message)}
+
+
+@contextmanager
+def upstream_call(kind):
+    """업스트림 호출(SPARQL, 외부 API, LLM) 시간을 현재 요청 트레이스에 더합니다. 수집 중이 아니면 아무 일도 안 함."""
+    calls = getattr(_local, "calls", None)
+    if calls is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        calls.append([kind, round((time.perf_counter() - started) * 1000.0, 1)])
+
+
+def record_upstream(kind, ms):
+    """이미 측정된 업스트림 시간 기록 (requests 응답 훅 등)"""
+    calls = getattr(_local, "calls", None)
+    if calls is not None:
+        calls.append([kind, round(ms, 1)])
+
+
+class TraceWriter:
+    """워커(프로세스)별 gzip JSON Lines 파일에 버퍼링해서 씁니다."""
+
+    def __init__(self, base_path):
+        self.base_path = base_path
+        self._lock = threading.Lock()
+        self._pid = None
+        self._buffer = []
+        self._last_flush = time.time()
+        self.written = 0
+
+    @property
+    def path(self):
+        return f"{self.base_path}.{os.getpid()}.jsonl.gz"
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._pid != os.getpid():
+                # fork 직후: 부모(preload) 프로세스의 버퍼는 버림
+                self._pid = os.getpid()
+                self._buffer = []
+            self._buffer.append(line)
+            if len(self._buffer) >= FLUSH_EVERY or time.time() - self._last_flush >= FLUSH_INTERVAL:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if self._buffer:
+            os.makedirs(os.path.dirname(os.path.abspath(self.base_path)), exist_ok=True)
+            # gzip 멤버를 이어 붙이므로 재시작 후에도 같은 파일에 추가 가능
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write("\n".join(self._buffer) + "\n")
+            self.written += len(self._buffer)
+            self._buffer = []
+        self._last_flush = time.time()
+
+
+def init_app(app, path=CAPTURE_PATH, sample_rate=SAMPLE_RATE):
+    """TRAFFIC_CAPTURE_PATH 가 있으면 요청 트레이스 훅을 등록합니다. 등록했으면 TraceWriter 반환."""
+    if not path:
+        return None
+    writer = TraceWriter(path)
+    atexit.register(writer.flush)
+    print(f"🎥 [트래픽 수집] {path}.<pid>.jsonl.gz (샘플링 {sample_rate:.0%})")
+
+    @app.before_request
+    def _start_trace():
+        _local.calls = None
+        if request.method == "OPTIONS" or random.random() >= sample_rate:
+            return
+        _local.calls = []
+        _local.started = time.time()
+        _local.started_perf = time.perf_counter()
+
+    @app.after_request
+    def _finish_trace(response):
+        calls = getattr(_local, "calls", None)
+        if calls is None:
+            return response
+        _local.calls = None
+
+        route = request.url_rule.rule if request.url_rule is not None else None
+        if route is None or route == "/api/health":
+            return response
+        record = {
+            "t": round(_local.started, 3),
+            "m": request.method,
+            "r": route,
+            "p": sanitize_params(request.args),
+            "s": response.status_code,
+            "d": round((time.perf_counter() - _local.started_perf) * 1000.0, 1),
+            "c": client_id(request.headers.get("X-Forwarded-For", request.remote_addr or "").split(",")[0].strip()),
+        }
+        if route == "/api/chat":
+            record["p"] = sanitize_chat(request.get_json(silent=True))
+        if request.headers.get("If-None-Match") or request.headers.get("If-Modified-Since"):
+            record["n"] = 1
+        if calls:
+            record["u"] = calls
+        writer.write(record)
+        return response
+
+    return writer
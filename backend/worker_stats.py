@@ -0,0 +1,71 @@
+"""
+워커별 동시 처리 현황
+
+gunicorn 워커(프로세스)마다 현재 처리 중인 요청 수, 최대 동시 요청 수, 누적 요청 수를 셉니다.
+/api/health 는 응답한 워커 자신의 값을 돌려주므로, 여러 번 호출하면 워커별 값을 볼 수 있습니다.
+"""
+import os
+import threading
+import time
+
+from flask import g, jsonify
+
+
+class WorkerStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """fork 직후 호출: 부모(preload) 프로세스의 값을 물려받지 않도록 초기화"""
+        self.pid = os.getpid()
+        self.started_at = time.time()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests_total = 0
+
+    def enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.requests_total += 1
+            if self.in_flight > self.peak_in_flight:
+                self.peak_in_flight = self.in_flight
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "pid": self.pid,
+                "uptime": round(time.time() - self.started_at, 1),
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "requests_total": self.requests_total,
+                "threads": int(os.getenv("GUNICORN_THREADS", "1")),
+            }
+
+
+worker_stats = WorkerStats()
+
+
+def init_app(app, extra=None):
+    """요청 카운트 훅과 /api/health 라우트를 등록합니다. extra() 결과는 응답에 합쳐집니다."""
+
+    @app.before_request
+    def _count_request():
+        worker_stats.enter()
+        g._worker_counted = True
+
+    @app.teardown_request
+    def _uncount_request(exc):
+        if g.pop("_worker_counted", False):
+            worker_stats.leave()
+
+    @app.route('/api/health', methods=['GET'])
+    def health():
+        info = worker_stats.snapshot()
+        if extra is not None:
+            info.update(extra())
+        return jsonify(info), 200
@@ -0,0 +1,11 @@
+"""
+WSGI 진입점 (운영용)
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+개발 중에는 기존처럼 `python app.py` 로 실행합니다.
+"""
+from app import app
+
+if __name__ == "__main__":
+    app.run(port=5001)
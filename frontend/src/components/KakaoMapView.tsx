@@ -2,6 +2,7 @@ import { useEffect, useRef, useState } from "react";
 import { Plus, Minus, Map, Satellite, Search, Settings, Navigation } from "lucide-react";
 import SettingsModal, { mapCategoryToMain } from "./SettingsModal";
 import SearchBar from "./SearchBar";
+import { getFacilitiesByGu } from "../utils/facilityStore";
 
 interface Facility {
   id: string | number;
@@ -90,15 +91,23 @@ export default function KakaoMapView({ center, guName, onBack, onMarkerClick }:
     }
   }, [center]);
 
-  // 데이터 로드
+  // 데이터 로드: IndexedDB 로컬 사본(변경분만 동기화) → 실패하면 기존 API 직접 조회
   useEffect(() => {
     if (!guName) return;
-    fetch(`http://localhost:5001/api/facilities?gu=${encodeURIComponent(guName)}`)
-      .then((res) => res.json())
+    const applyData = (data: Facility[]) => {
+      setFacilities(data);
+      setFilteredFacilities(data); 
+    };
+    getFacilitiesByGu(guName)
       .then((data) => {
-        setFacilities(data);
-        setFilteredFacilities(data); 
+        if (data.length === 0) throw new Error("로컬 시설 데이터 없음");
+        applyData(data);
       })
+      .catch(() =>
+        fetch(`http://localhost:5001/api/facilities?gu=${encodeURIComponent(guName)}`)
+          .then((res) => res.json())
+          .then(applyData)
+      )
       .catch((err) => console.error("시설 조회 실패:", err));
   }, [guName]);
 
@@ -199,6 +208,16 @@ export default function KakaoMapView({ center, guName, onBack, onMarkerClick }:
     
     if (foundFacility) {
       moveAndPin(foundFacility);
+    } else if (typeof result.lat === 'number' && typeof result.lng === 'number') {
+      // 서버가 좌표를 같이 내려주면 Geocoder 호출 없이 바로 이동
+      moveAndPin({
+        id: result.uri || Date.now(),
+        name: result.label,
+        category: result.type || 'search_result',
+        lat: result.lat,
+        lng: result.lng,
+        address: result.address
+      });
     } else if (result.address) {
       const { kakao } = window as any;
       
@@ -0,0 +1,122 @@
+// 시설 데이터 로컬 캐시 (IndexedDB)
+// 처음 한 번만 전체 목록을 받고, 이후에는 /api/facilities/changes?since=<version> 으로
+// 바뀐 시설만 받아 로컬 사본에 반영합니다.
+
+const API_BASE = 'http://localhost:5001';
+const DB_NAME = 'animalloo';
+const DB_VERSION = 1;
+const FACILITY_STORE = 'facilities';
+const META_STORE = 'meta';
+// 같은 세션에서 구를 옮겨 다닐 때 매번 동기화하지 않도록 최소 간격을 둠
+const SYNC_INTERVAL_MS = 5 * 60 * 1000;
+// 동기화 실패(서버에 변경 이력 없음 등) 후 다시 시도하기까지의 간격
+// 그 사이에는 로컬 사본(없으면 /api/facilities)만 사용해 요청이 두 배로 늘지 않게 함
+const SYNC_RETRY_MS = 60 * 1000;
+
+export interface StoredFacility {
+  id: string;
+  name: string;
+  category: string;
+  categories?: string[];
+  lat: number;
+  lng: number;
+  address: string;
+  tel?: string;
+  desc?: string;
+  gu: string;
+}
+
+interface ChangesResponse {
+  version: number;
+  full: boolean;
+  facilities?: StoredFacility[];
+  added?: StoredFacility[];
+  updated?: StoredFacility[];
+  deleted?: string[];
+}
+
+let dbPromise: Promise<IDBDatabase> | null = null;
+let syncPromise: Promise<void> | null = null;
+let lastSyncedAt = 0;
+let lastFailedAt = 0;
+
+const openDb = (): Promise<IDBDatabase> => {
+  if (!dbPromise) {
+    dbPromise = new Promise((resolve, reject) => {
+      const request = indexedDB.open(DB_NAME, DB_VERSION);
+      request.onupgradeneeded = () => {
+        const db = request.result;
+        const store = db.createObjectStore(FACILITY_STORE, { keyPath: 'id' });
+        store.createIndex('gu', 'gu');
+        db.createObjectStore(META_STORE);
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+  }
+  return dbPromise;
+};
+
+const promisify = <T>(request: IDBRequest<T>): Promise<T> =>
+  new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+
+const getVersion = async (db: IDBDatabase): Promise<number | undefined> => {
+  const tx = db.transaction(META_STORE, 'readonly');
+  return promisify(tx.objectStore(META_STORE).get('version'));
+};
+
+const applyChanges = (db: IDBDatabase, changes: ChangesResponse): Promise<void> =>
+  new Promise((resolve, reject) => {
+    const tx = db.transaction([FACILITY_STORE, META_STORE], 'readwrite');
+    const store = tx.objectStore(FACILITY_STORE);
+
+    if (changes.full) {
+      store.clear();
+      (changes.facilities || []).forEach((f) => store.put(f));
+    } else {
+      [...(changes.added || []), ...(changes.updated || [])].forEach((f) => store.put(f));
+      (changes.deleted || []).forEach((id) => store.delete(id));
+    }
+    tx.objectStore(META_STORE).put(changes.version, 'version');
+
+    tx.oncomplete = () => resolve();
+    tx.onerror = () => reject(tx.error);
+  });
+
+// 서버와 동기화 (동시에 여러 번 불려도 요청은 한 번만)
+export const syncFacilities = (): Promise<void> => {
+  const now = Date.now();
+  if (now - lastSyncedAt < SYNC_INTERVAL_MS || now - lastFailedAt < SYNC_RETRY_MS) {
+    return Promise.resolve();
+  }
+  if (!syncPromise) {
+    syncPromise = (async () => {
+      const db = await openDb();
+      const version = await getVersion(db);
+      const query = version !== undefined ? `?since=${version}` : '';
+      const res = await fetch(`${API_BASE}/api/facilities/changes${query}`);
+      if (!res.ok) throw new Error(`시설 동기화 실패: ${res.status}`);
+      await applyChanges(db, await res.json());
+      lastSyncedAt = Date.now();
+    })()
+      .catch((err) => {
+        lastFailedAt = Date.now();
+        throw err;
+      })
+      .finally(() => {
+        syncPromise = null;
+      });
+  }
+  return syncPromise;
+};
+
+// 로컬 사본에서 구별 시설 목록 조회 (먼저 변경분 동기화)
+export const getFacilitiesByGu = async (gu: string): Promise<StoredFacility[]> => {
+  await syncFacilities();
+  const db = await openDb();
+  const tx = db.transaction(FACILITY_STORE, 'readonly');
+  return promisify(tx.objectStore(FACILITY_STORE).index('gu').getAll(gu));
+};